@@ -0,0 +1,444 @@
+import threading
+from app_init import db
+from models.movies import Movie
+from models.actors import Actor
+from models.genres import Genre
+from utils import get_data_version
+from models.directors import Director
+from models.associations import movie_genres, movie_actors, movie_directors
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, the columnar engine is disabled
+    np = None
+
+
+class LinkIndex:
+    """
+    CSR encoding of a many-to-many association between movies and an entity.
+
+    `indptr`/`movies` list the movie rows of every entity and `movie_indptr`/`members`
+    list the entity rows of every movie. Entities and movies are addressed by their
+    position in the id-sorted `ids` and `ColumnarCatalog.movie_ids` arrays.
+    """
+
+    def __init__(self, ids, link_movies, link_members, movie_count: int) -> None:
+        self.ids = ids
+
+        # entity -> movies
+        order = np.lexsort((link_movies, link_members))
+        self.owners = link_members[order]
+        self.movies = link_movies[order]
+        self.counts = np.bincount(self.owners, minlength=len(ids))
+        self.indptr = np.concatenate(([0], np.cumsum(self.counts)))
+
+        # movie -> entities
+        order = np.lexsort((link_members, link_movies))
+        self.members = link_members[order]
+        self.movie_indptr = np.concatenate(
+            ([0], np.cumsum(np.bincount(link_movies, minlength=movie_count)))
+        )
+
+    @classmethod
+    def load(cls, entity_model, association_table, column_name: str, movie_ids):
+        """
+        Load an association table into CSR arrays.
+
+        Args:
+            entity_model (db.Model): The model on the other side of the association.
+            association_table: The association table.
+            column_name (str): The entity column name in the association table.
+            movie_ids (np.ndarray): The sorted movie ids of the catalog.
+
+        Returns:
+            LinkIndex: The loaded association.
+        """
+        ids = np.fromiter(
+            db.session.execute(
+                db.select(entity_model.id).order_by(entity_model.id)
+            ).scalars(),
+            dtype=np.int64,
+        )
+        links = np.array(
+            db.session.execute(
+                db.select(
+                    association_table.c.movie_id, association_table.c[column_name]
+                )
+            ).all(),
+            dtype=np.int64,
+        ).reshape(-1, 2)
+
+        return cls(
+            ids,
+            np.searchsorted(movie_ids, links[:, 0]),
+            np.searchsorted(ids, links[:, 1]),
+            len(movie_ids),
+        )
+
+    def reduce_movies(self, values, ufunc, fill):
+        """
+        Reduce a per-movie column over the movies of every entity.
+
+        Args:
+            values (np.ndarray): A float per-movie column, NaN for missing values.
+            ufunc (np.ufunc): The reduction, e.g. np.minimum.
+            fill (float): Identity of the reduction, used for missing values.
+
+        Returns:
+            np.ndarray: The reduced value per entity, `fill` for entities without movies.
+        """
+        linked = np.where(np.isnan(values), fill, values)[self.movies]
+        result = np.full(len(self.ids), fill)
+
+        # reduceat misbehaves on empty segments, only reduce the non-empty ones
+        present = self.counts > 0
+        if linked.size:
+            result[present] = ufunc.reduceat(linked, self.indptr[:-1][present])
+
+        return result
+
+    def rated_averages(self, rating):
+        """
+        Average the non-null movie ratings of every entity.
+
+        Args:
+            rating (np.ndarray): The per-movie ratings, NaN for missing ratings.
+
+        Returns:
+            tuple: The number of rated movies and the average rating per entity.
+        """
+        linked = rating[self.movies]
+        rated = ~np.isnan(linked)
+        counts = np.bincount(self.owners[rated], minlength=len(self.ids))
+        sums = np.bincount(
+            self.owners[rated], weights=linked[rated], minlength=len(self.ids)
+        )
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return counts, sums / counts
+
+
+class ColumnarCatalog:
+    """
+    Columnar in-memory copy of the numeric catalog data, answering the /stats
+    aggregates with vectorized NumPy operations instead of SQL.
+
+    Everything derived from a full sort is computed once when the catalog is loaded,
+    so per-request work is limited to linear reductions over compact arrays.
+    """
+
+    def __init__(
+        self, version: int, columns: tuple, actors, directors, genres, genre_names
+    ):
+        movie_ids, release_year, duration, rating, mpaa_rating = columns
+
+        self.version = version
+        self.movie_ids = movie_ids
+        self.release_year = release_year
+        self.duration = duration
+        self.rating = rating
+
+        # MPAA ratings as small integer codes, missing ratings last
+        labels = {label for label in mpaa_rating if label is not None}
+        self.mpaa_labels = sorted(labels) + ([None] if None in mpaa_rating else [])
+        codes = {label: code for code, label in enumerate(self.mpaa_labels)}
+        self.mpaa_codes = np.fromiter(
+            (codes[label] for label in mpaa_rating), np.int64, len(mpaa_rating)
+        )
+
+        # release years as codes, missing years in the last bucket
+        valid_years = ~np.isnan(release_year)
+        self.years = np.unique(release_year[valid_years]).astype(np.int64)
+        self.year_codes = np.where(
+            valid_years,
+            np.searchsorted(self.years, np.nan_to_num(release_year)),
+            len(self.years),
+        )
+        self.year_labels = self.years.tolist() + [None]
+
+        # durations sorted once for the median
+        self.sorted_durations = np.sort(duration[~np.isnan(duration)])
+
+        self.actors = actors
+        self.directors = directors
+        self.genres = genres
+        self.genre_names = genre_names
+        self._pairings = None
+
+    @classmethod
+    def load(cls, version: int):
+        """
+        Load the catalog from the database.
+
+        Args:
+            version (int): The data version the catalog is loaded at.
+
+        Returns:
+            ColumnarCatalog: The loaded catalog.
+        """
+        rows = db.session.execute(
+            db.select(
+                Movie.id,
+                Movie.release_year,
+                Movie.duration,
+                Movie.rating,
+                Movie.mpaa_rating,
+            ).order_by(Movie.id)
+        ).all()
+
+        movie_ids = np.fromiter((row[0] for row in rows), np.int64, len(rows))
+        columns = (
+            movie_ids,
+            *(
+                np.array([row[index] for row in rows], dtype=np.float64)
+                for index in range(1, 4)
+            ),
+            [row[4] for row in rows],
+        )
+
+        return cls(
+            version,
+            columns,
+            LinkIndex.load(Actor, movie_actors, "actor_id", movie_ids),
+            LinkIndex.load(Director, movie_directors, "director_id", movie_ids),
+            LinkIndex.load(Genre, movie_genres, "genre_id", movie_ids),
+            dict(db.session.query(Genre.id, Genre.name).all()),
+        )
+
+    def count_by_year(self) -> dict:
+        """
+        Count movies per release year, missing years last.
+
+        Returns:
+            dict: A dictionary with years as keys and counts as values.
+        """
+        counts = np.bincount(self.year_codes, minlength=len(self.year_labels))
+
+        return {
+            year: int(count)
+            for year, count in zip(self.year_labels, counts.tolist())
+            if count
+        }
+
+    def average_rating_by_year(self) -> dict:
+        """
+        Average the non-null ratings per release year, missing years last.
+
+        Returns:
+            dict: A dictionary with years as keys and average ratings as values.
+        """
+        rated = ~np.isnan(self.rating)
+        counts = np.bincount(self.year_codes[rated], minlength=len(self.year_labels))
+        sums = np.bincount(
+            self.year_codes[rated],
+            weights=self.rating[rated],
+            minlength=len(self.year_labels),
+        )
+
+        return {
+            year: sums[code] / counts[code]
+            for code, year in enumerate(self.year_labels)
+            if counts[code]
+        }
+
+    def mpaa_distribution(self) -> dict:
+        """
+        Count movies per MPAA rating.
+
+        Returns:
+            dict: A dictionary with MPAA ratings as keys and counts as values.
+        """
+        counts = np.bincount(self.mpaa_codes, minlength=len(self.mpaa_labels))
+
+        return dict(zip(self.mpaa_labels, counts.tolist()))
+
+    def count_between(self, values, bins: dict) -> dict:
+        """
+        Count the values falling in each of the bins, both bounds inclusive.
+
+        Args:
+            values (np.ndarray): The per-movie column.
+            bins (dict): A dictionary with labels as keys and (low, high) as values.
+
+        Returns:
+            dict: A dictionary with labels as keys and counts as values.
+        """
+        return {
+            label: int(np.count_nonzero((values >= low) & (values <= high)))
+            for label, (low, high) in bins.items()
+        }
+
+    def length_brackets(self) -> dict:
+        """
+        Count movies per length bracket, with the same precedence as the SQL CASE.
+
+        Returns:
+            dict: A dictionary with brackets as keys and counts as values, empty
+                brackets are left out.
+        """
+        duration = self.duration
+        brackets = {
+            "< 90 min": duration < 90,
+            "90-120 min": (duration >= 90) & (duration <= 120),
+            "120-150 min": (duration > 120) & (duration <= 150),
+            "> 150 min": duration > 150,
+            "Unknown": np.isnan(duration),
+        }
+        counts = {
+            label: int(np.count_nonzero(mask)) for label, mask in brackets.items()
+        }
+
+        return {label: count for label, count in counts.items() if count}
+
+    def median_duration(self):
+        """
+        Get the median of the known durations, interpolated like percentile_cont.
+
+        Returns:
+            float or None: The median, None if no duration is known.
+        """
+        if not self.sorted_durations.size:
+            return None
+
+        return float(np.median(self.sorted_durations))
+
+    def average_duration(self):
+        """
+        Average the known durations.
+
+        Returns:
+            float or None: The average, None if no duration is known.
+        """
+        if not self.sorted_durations.size:
+            return None
+
+        return float(self.sorted_durations.mean())
+
+    def first_movie(self, values, descending: bool = False):
+        """
+        Find the movie a PostgreSQL ORDER BY on the column, then id, returns first.
+
+        Args:
+            values (np.ndarray): The per-movie column, NaN for missing values.
+            descending (bool): Order descending (nulls first) instead of ascending
+                (nulls last).
+
+        Returns:
+            int or None: The id of the movie, None for an empty catalog.
+        """
+        missing = np.isnan(values)
+        if missing.all():
+            return int(self.movie_ids[0]) if values.size else None
+        if descending and missing.any():
+            return int(self.movie_ids[np.argmax(missing)])
+
+        # argmin and argmax return the first, i.e. lowest id, of any ties
+        index = np.nanargmax(values) if descending else np.nanargmin(values)
+        return int(self.movie_ids[index])
+
+    def top_rated(self, limit: int) -> list:
+        """
+        Find the best rated movies, ties broken by id.
+
+        Args:
+            limit (int): Number of movies to return.
+
+        Returns:
+            list: The ids of the movies, best first.
+        """
+        candidates = np.flatnonzero(~np.isnan(self.rating))
+        return [
+            int(self.movie_ids[index])
+            for index in top_n(self.rating[candidates], limit, candidates)
+        ]
+
+    def pairings(self):
+        """
+        Count the movies every actor and director made together.
+
+        Returns:
+            tuple: The actor rows, director rows and counts of every pairing.
+        """
+        if self._pairings is not None:
+            return self._pairings
+
+        actors, directors = self.actors, self.directors
+        directors_per_movie = np.diff(directors.movie_indptr)
+
+        # one entry per (actor link, director of that movie)
+        repeats = directors_per_movie[actors.movies]
+        pair_actors = np.repeat(actors.owners, repeats)
+        starts = np.repeat(directors.movie_indptr[actors.movies], repeats)
+        offsets = np.arange(repeats.sum()) - np.repeat(
+            np.cumsum(repeats) - repeats, repeats
+        )
+        pair_directors = directors.members[starts + offsets]
+
+        keys, counts = np.unique(
+            pair_actors * len(directors.ids) + pair_directors, return_counts=True
+        )
+        self._pairings = (keys // len(directors.ids), keys % len(directors.ids), counts)
+
+        return self._pairings
+
+
+def top_n(values, limit: int, positions=None):
+    """
+    Select the positions of the largest values, ties broken by lowest position.
+
+    Args:
+        values (np.ndarray): The values to rank.
+        limit (int): Number of positions to return.
+        positions (np.ndarray, optional): Positions reported for each value.
+            Defaults to the indices of `values`.
+
+    Returns:
+        np.ndarray: The selected positions, largest value first.
+    """
+    if positions is None:
+        positions = np.arange(len(values))
+    if len(values) > limit:
+        # everything tied with the limit-th largest value is a candidate
+        threshold = np.partition(values, len(values) - limit)[len(values) - limit]
+        keep = values >= threshold
+        values, positions = values[keep], positions[keep]
+
+    order = np.lexsort((positions, -values))
+
+    return positions[order][:limit]
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def columnar_engine_available() -> bool:
+    """
+    Check whether the optional NumPy dependency of the columnar engine is installed.
+
+    Returns:
+        bool: True if the columnar engine can be used.
+    """
+    return np is not None
+
+
+def get_catalog(version: int = None) -> ColumnarCatalog:
+    """
+    Get the columnar catalog, reloading it if the data version changed.
+
+    Args:
+        version (int, optional): The current data version, read from the database
+            when None.
+
+    Returns:
+        ColumnarCatalog: The catalog at the current data version.
+    """
+    global _catalog
+
+    if version is None:
+        version = get_data_version()
+    with _catalog_lock:
+        if _catalog is None or _catalog.version != version:
+            _catalog = ColumnarCatalog.load(version)
+
+        return _catalog
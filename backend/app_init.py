@@ -13,6 +13,61 @@ app = Flask(__name__)
 base_dir = os.path.abspath(os.path.dirname(__file__))
 app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DB_URI")
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+
+# /stats execution: "serial" runs sections one after another on the request
+# session, "parallel" fans them out to a bounded pool of worker sessions
+app.config["STATS_EXECUTION_MODE"] = os.getenv("STATS_EXECUTION_MODE", "serial")
+app.config["STATS_MAX_WORKERS"] = int(os.getenv("STATS_MAX_WORKERS", 5))
+app.config["STATS_SECTION_TIMEOUT"] = float(os.getenv("STATS_SECTION_TIMEOUT", 10))
+
+# /stats engine: "sql" aggregates in the database, behind the stats snapshot
+# maintained by populate_db.py, "columnar" computes every section from an in-memory
+# NumPy copy of the catalog (requires the optional numpy dependency)
+app.config["STATS_ENGINE"] = os.getenv("STATS_ENGINE", "sql")
+
+# serialization of the list and detail endpoints: "compiled" selects the schema
+# fields as plain rows and skips marshmallow, "marshmallow" dumps ORM entities
+app.config["SERIALIZER"] = os.getenv("SERIALIZER", "compiled")
+
+# most IDs or slugs a /<resource>/batch lookup may ask for
+app.config["BATCH_MAX_SIZE"] = int(os.getenv("BATCH_MAX_SIZE", 100))
+
+# where the caches below live: "memory" caches are private to every worker
+# process, "sqlite" caches are shared by the workers of a host through CACHE_PATH,
+# by default a file in a private directory under the user's cache directory
+app.config["CACHE_BACKEND"] = os.getenv("CACHE_BACKEND", "memory")
+app.config["CACHE_PATH"] = os.getenv("CACHE_PATH")
+
+# seconds a computed /stats section stays cached, the data version bumped by
+# populate_db.py invalidates it earlier
+app.config["STATS_CACHE_TTL"] = float(os.getenv("STATS_CACHE_TTL", 300))
+
+# seconds an exact paginated total stays cached, the data version bumped by
+# populate_db.py invalidates it earlier
+app.config["COUNT_CACHE_TTL"] = float(os.getenv("COUNT_CACHE_TTL", 300))
+
+# serialized responses of the list and detail endpoints: seconds an entry stays
+# cached (the data version bumped by populate_db.py invalidates it earlier) and the
+# number of entries kept before the least recently used ones are evicted
+app.config["RESPONSE_CACHE_TTL"] = float(os.getenv("RESPONSE_CACHE_TTL", 60))
+app.config["RESPONSE_CACHE_MAX_ENTRIES"] = int(
+    os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 1024)
+)
+
+# seconds between data version checks of the /autocomplete name index, which is
+# rebuilt when populate_db.py bumped the version
+app.config["AUTOCOMPLETE_VERSION_CHECK_INTERVAL"] = float(
+    os.getenv("AUTOCOMPLETE_VERSION_CHECK_INTERVAL", 5)
+)
+
+# fuzzy searches (?fuzzy=true) keep at most this many closest matches, responses
+# of searches matching more are flagged "truncated" as their total is capped too
+app.config["FUZZY_MAX_MATCHES"] = int(os.getenv("FUZZY_MAX_MATCHES", 1000))
+
+# responses of at least this many bytes are gzip or brotli compressed for clients
+# accepting it, brotli requires the optional brotli dependency
+app.config["COMPRESSION_MIN_SIZE"] = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+
 CORS(app)  # Enable CORS for all routes
 
 
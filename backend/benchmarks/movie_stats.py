@@ -0,0 +1,156 @@
+"""
+Benchmark the single scan movie stats against the one-query-per-statistic version.
+
+Seeds a synthetic catalog into a scratch PostgreSQL database, then reports the number
+of database round trips and the wall time of both implementations and checks that
+they produce identical output.
+
+Usage (from backend/):
+    python -m benchmarks.movie_stats --db-uri postgresql://localhost/scratch --seed 500000
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from contextlib import contextmanager
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the movie stats aggregation engine."
+    )
+    parser.add_argument(
+        "--db-uri",
+        required=True,
+        help="URI of a scratch database, synthetic rows are written to it.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Number of synthetic movies to insert before benchmarking.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Number of timed runs of each implementation.",
+    )
+
+    return parser.parse_args()
+
+
+def synthetic_movies(count: int, rng: random.Random):
+    """
+    Generate synthetic movie rows, with the occasional missing value.
+
+    Args:
+        count (int): Number of movies to generate.
+        rng (random.Random): The random generator to draw from.
+
+    Yields:
+        dict: A row for the movies table.
+    """
+    prefix = rng.getrandbits(32)
+    for index in range(count):
+        yield {
+            "title": f"Synthetic Movie {index}",
+            "release_year": rng.randint(1920, 2025) if rng.random() > 0.01 else None,
+            "duration": rng.randint(60, 210) if rng.random() > 0.01 else None,
+            "rating": round(rng.uniform(1, 10), 1) if rng.random() > 0.05 else None,
+            "mpaa_rating": rng.choice(["G", "PG", "PG-13", "R", "NC-17", None]),
+            "poster_url": f"https://example.com/posters/{index}.jpg",
+            "slug": f"synthetic-{prefix:x}-{index}",
+        }
+
+
+@contextmanager
+def count_round_trips(engine):
+    """
+    Count the statements sent to the database while the context is active.
+
+    Args:
+        engine (Engine): The SQLAlchemy engine to listen on.
+
+    Yields:
+        list: A single element list holding the running count.
+    """
+    from sqlalchemy import event
+
+    counter = [0]
+
+    def on_execute(*_):
+        counter[0] += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+
+
+def benchmark(fetch, engine, repeat: int):
+    """
+    Run a stats implementation several times.
+
+    Args:
+        fetch (callable): The implementation to run.
+        engine (Engine): The SQLAlchemy engine it runs against.
+        repeat (int): Number of timed runs.
+
+    Returns:
+        tuple: The last result, round trips per run and the best wall time in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        with count_round_trips(engine) as round_trips:
+            start = time.perf_counter()
+            result = fetch()
+            best = min(best, time.perf_counter() - start)
+
+    return result, round_trips[0], best
+
+
+def main():
+    args = parse_args()
+
+    # the app reads its database URI at import time
+    os.environ["DB_URI"] = args.db_uri
+    from app_init import app, db
+    from models.movies import Movie
+    from endpoints.stats import fetch_movie_stats, fetch_movie_stats_by_parts
+
+    with app.app_context():
+        db.create_all()
+
+        if args.seed:
+            rows = list(synthetic_movies(args.seed, random.Random(args.seed)))
+            for start in range(0, len(rows), 10_000):
+                db.session.execute(
+                    Movie.__table__.insert(), rows[start : start + 10_000]
+                )
+            db.session.commit()
+
+        total = db.session.query(db.func.count(Movie.id)).scalar()
+        print(f"catalog: {total} movies")
+
+        results = dict()
+        for name, fetch in [
+            ("one query per statistic", fetch_movie_stats_by_parts),
+            ("single scan", fetch_movie_stats),
+        ]:
+            result, round_trips, seconds = benchmark(fetch, db.engine, args.repeat)
+            results[name] = result
+            print(f"{name:>24}: {round_trips:3d} round trips, {seconds * 1000:9.2f} ms")
+
+    expected, actual = results.values()
+    if expected != actual:
+        print("outputs differ", file=sys.stderr)
+        sys.exit(1)
+    print("outputs identical")
+
+
+if __name__ == "__main__":
+    main()
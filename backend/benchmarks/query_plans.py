@@ -0,0 +1,244 @@
+"""
+Check that the hot queries of the API are served by indexes.
+
+Seeds a synthetic catalog into a scratch database and applies the migrations, then
+sends the hot requests below through the app, captures every statement they run and
+EXPLAINs it. Exits with status 1 if any plan reads a large table with a sequential
+scan, so a regression in the indexes or in a query shape fails the check.
+
+Usage (from backend/):
+    python -m benchmarks.query_plans --db-uri postgresql://localhost/scratch --seed 200000
+"""
+
+import os
+import re
+import sys
+import json
+import random
+import argparse
+
+from benchmarks.movie_stats import synthetic_movies
+
+# requests whose queries must be index driven, {actor}, {director}, {genre} and
+# {movie} are replaced by existing ids. Counts over a large share of a table are
+# skipped with count=none, reading most of the table is the right plan for them
+HOT_REQUESTS = [
+    "/api/v1/movies?release_year=2000",
+    "/api/v1/movies?mpaa_rating=NC-17&count=none",
+    "/api/v1/movies?rating_min=9.5&sort_by=rating&ascending=false",
+    "/api/v1/movies?duration_min=200&duration_max=210",
+    "/api/v1/movies?sort_by=title&count=none",
+    "/api/v1/movies?sort_by=rating&ascending=false&count=none",
+    "/api/v1/movies?sort_by=release_year&cursor=",
+    "/api/v1/movies?genre_id={genre}&actor_id={actor},{actor}1",
+    "/api/v1/movies?director_id={director}&release_year_min=2000",
+    "/api/v1/actors?sort_by=name&count=none",
+    "/api/v1/directors?sort_by=name&count=none",
+    "/api/v1/actors/{actor}/movies",
+    "/api/v1/directors/{director}/movies",
+    "/api/v1/genres/{genre}/movies?count=none",
+    "/api/v1/movies/{movie}/actors",
+    "/api/v1/movies/{movie}/directors",
+    "/api/v1/movies/{movie}/genres",
+    "/api/v1/actors/{actor}/collaborators",
+]
+
+# tables small enough for a sequential scan to be the best plan
+SMALL_TABLES = {"genres", "data_versions", "schema_migrations"}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Check the plans of hot queries.")
+    parser.add_argument(
+        "--db-uri",
+        required=True,
+        help="URI of a scratch database, synthetic rows are written to it.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Number of synthetic movies to insert before checking.",
+    )
+
+    return parser.parse_args()
+
+
+def seed_catalog(db, count: int, rng: random.Random) -> None:
+    """
+    Insert synthetic movies, people, genres and the links between them.
+
+    Args:
+        db (SQLAlchemy): The app's database.
+        count (int): Number of movies to insert.
+        rng (random.Random): The random generator to draw from.
+    """
+    from models import Movie, Actor, Director, Genre
+    from models import movie_actors, movie_directors, movie_genres
+
+    def insert(table, rows):
+        for start in range(0, len(rows), 10_000):
+            db.session.execute(table.insert(), rows[start : start + 10_000])
+
+    first = (db.session.query(db.func.max(Movie.id)).scalar() or 0) + 1
+    prefix = f"{rng.getrandbits(32):x}"
+    people = max(count // 10, 1)
+
+    insert(Movie.__table__, list(synthetic_movies(count, rng)))
+    for model, total in [(Actor, people), (Director, people // 4 + 1), (Genre, 20)]:
+        table = model.__table__
+        start = (db.session.query(db.func.max(model.id)).scalar() or 0) + 1
+        rows = [
+            {"name": f"{table.name} {index}", "slug": f"{prefix}-{table.name}-{index}"}
+            for index in range(total)
+        ]
+        insert(table, rows)
+        model.seeded = range(start, start + total)
+
+    movies = range(first, first + count)
+    insert(
+        movie_actors,
+        [
+            {"movie_id": movie, "actor_id": actor}
+            for movie in movies
+            for actor in set(rng.choices(Actor.seeded, k=4))
+        ],
+    )
+    insert(
+        movie_directors,
+        [
+            {"movie_id": movie, "director_id": rng.choice(Director.seeded)}
+            for movie in movies
+        ],
+    )
+    insert(
+        movie_genres,
+        [
+            {"movie_id": movie, "genre_id": genre}
+            for movie in movies
+            for genre in set(rng.choices(Genre.seeded, k=2))
+        ],
+    )
+    db.session.commit()
+
+
+def sequential_scans(connection, statement, parameters, tables) -> list:
+    """
+    EXPLAIN a statement and list the large tables its plan scans sequentially.
+
+    Args:
+        connection (Connection): The SQLAlchemy connection to explain on.
+        statement (str): The statement as sent to the driver.
+        parameters: The statement's driver parameters.
+        tables (set): Names of the tables a sequential scan is a regression on.
+
+    Returns:
+        list: The sequentially scanned tables.
+    """
+    if connection.dialect.name == "postgresql":
+        (plan,) = connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+        ).scalar()
+        plan = plan if isinstance(plan, dict) else json.loads(plan)[0]
+
+        scanned, nodes = [], [plan["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            nodes.extend(node.get("Plans", []))
+            if node["Node Type"] == "Seq Scan":
+                scanned.append(node["Relation Name"])
+    else:
+        rows = connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement}", parameters
+        ).fetchall()
+        scanned = [
+            match.group(2)
+            for *_, detail in rows
+            if (match := re.fullmatch(r"SCAN (TABLE )?(\w+)", detail))
+        ]
+
+    return [table for table in scanned if table in tables]
+
+
+def main():
+    args = parse_args()
+
+    # the app reads its database URI at import time
+    os.environ["DB_URI"] = args.db_uri
+    import main as api
+    from sqlalchemy import event
+    from app_init import app, db
+    from migrations import run_migrations
+    from utils import response_cache, count_cache
+    from models import Movie, Actor, Director, Genre
+
+    with app.app_context():
+        db.create_all()
+        if args.seed:
+            seed_catalog(db, args.seed, random.Random(args.seed))
+        run_migrations(verbose=True)
+
+        if db.engine.dialect.name == "postgresql":
+            with db.engine.connect() as connection:
+                connection.execution_options(isolation_level="AUTOCOMMIT")
+                connection.exec_driver_sql("VACUUM ANALYZE")
+
+        ids = {
+            name: db.session.query(db.func.min(model.id)).scalar()
+            for name, model in [
+                ("movie", Movie),
+                ("actor", Actor),
+                ("director", Director),
+                ("genre", Genre),
+            ]
+        }
+        tables = set(db.metadata.tables) - SMALL_TABLES
+
+        statements = []
+
+        def capture(connection, cursor, statement, parameters, *_):
+            if not statement.lstrip().upper().startswith("EXPLAIN"):
+                statements.append((statement, parameters))
+
+        event.listen(db.engine, "before_cursor_execute", capture)
+
+        client = api.app.test_client()
+        regressions = 0
+        for request in HOT_REQUESTS:
+            url = request.format(**ids)
+            response_cache.clear()
+            count_cache.clear()
+            statements.clear()
+
+            response = client.get(url).get_json()
+            if response["status"] != "success":
+                print(f"FAIL {url}: {response}")
+                regressions += 1
+                continue
+
+            captured = list(statements)
+            with db.engine.connect() as connection:
+                scanned = sorted(
+                    {
+                        table
+                        for statement, parameters in captured
+                        for table in sequential_scans(
+                            connection, statement, parameters, tables
+                        )
+                    }
+                )
+
+            if scanned:
+                regressions += 1
+                print(f"SEQ SCAN {url}: {', '.join(scanned)}")
+            else:
+                print(f"ok       {url} ({len(captured)} statements)")
+
+    if regressions:
+        print(f"{regressions} hot queries regressed", file=sys.stderr)
+        sys.exit(1)
+    print("every hot query is index driven")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmark the indexed search against the sequential ILIKE '%term%' scan.
+
+Seeds synthetic movies into a scratch database, applies the migrations, then reports
+the best wall time of both searches for a few terms and checks that they find the
+same movies. On PostgreSQL the scan is measured with index scans disabled, since the
+trigram index also serves plain ILIKE.
+
+Usage (from backend/):
+    python -m benchmarks.search --db-uri postgresql://localhost/scratch --seed 1000000
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+WORDS = (
+    "night river shadow summer city ghost last house road golden winter secret king "
+    "storm dream blood glass star island paper silent wild broken fire lost heart north"
+).split()
+
+TERMS = ["ghost", "er of", "silent of star", "zzz", "nd of ro"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the title search.")
+    parser.add_argument(
+        "--db-uri",
+        required=True,
+        help="URI of a scratch database, synthetic rows are written to it.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Number of synthetic movies to insert before benchmarking.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Number of timed runs of each search.",
+    )
+
+    return parser.parse_args()
+
+
+def synthetic_titles(count: int, rng: random.Random):
+    """
+    Generate synthetic movie rows with titles of two to four random words.
+
+    Args:
+        count (int): Number of movies to generate.
+        rng (random.Random): The random generator to draw from.
+
+    Yields:
+        dict: A row for the movies table.
+    """
+    prefix = rng.getrandbits(32)
+    for index in range(count):
+        words = rng.sample(WORDS, rng.randint(2, 4))
+        yield {
+            "title": " of ".join(words).title(),
+            "slug": f"search-{prefix:x}-{index}",
+        }
+
+
+def benchmark(search, repeat: int):
+    """
+    Run a search several times.
+
+    Args:
+        search (callable): The search to run, returning the matching IDs.
+        repeat (int): Number of timed runs.
+
+    Returns:
+        tuple: The last result and the best wall time in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = search()
+        best = min(best, time.perf_counter() - start)
+
+    return result, best
+
+
+def main():
+    args = parse_args()
+
+    # the app reads its database URI at import time
+    os.environ["DB_URI"] = args.db_uri
+    from app_init import app, db
+    from models.movies import Movie
+    from migrations import run_migrations
+    from utils import search_condition
+
+    def scan(term):
+        if db.engine.dialect.name == "postgresql":
+            db.session.execute(db.text("SET LOCAL enable_bitmapscan = off"))
+            db.session.execute(db.text("SET LOCAL enable_indexscan = off"))
+        ids = db.session.query(Movie.id).filter(Movie.title.ilike(f"%{term}%")).all()
+        db.session.rollback()
+        return sorted(id for (id,) in ids)
+
+    def indexed(term):
+        ids = db.session.query(Movie.id).filter(search_condition(Movie.title, term))
+        return sorted(id for (id,) in ids.all())
+
+    with app.app_context():
+        db.create_all()
+
+        if args.seed:
+            rows = list(synthetic_titles(args.seed, random.Random(args.seed)))
+            for start in range(0, len(rows), 10_000):
+                db.session.execute(
+                    Movie.__table__.insert(), rows[start : start + 10_000]
+                )
+            db.session.commit()
+
+        run_migrations(verbose=True)
+
+        total = db.session.query(db.func.count(Movie.id)).scalar()
+        print(f"catalog: {total} movies")
+
+        differ = False
+        for term in TERMS:
+            expected, scan_seconds = benchmark(lambda: scan(term), args.repeat)
+            actual, index_seconds = benchmark(lambda: indexed(term), args.repeat)
+            differ = differ or expected != actual
+            print(
+                f"{term!r:>14}: {len(actual):7d} matches, "
+                f"scan {scan_seconds * 1000:9.2f} ms, "
+                f"indexed {index_seconds * 1000:9.2f} ms"
+            )
+
+    if differ:
+        print("results differ", file=sys.stderr)
+        sys.exit(1)
+    print("results identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+import os
+import sys
+import json
+import time
+import stat
+import base64
+import sqlite3
+import hashlib
+import threading
+from app_init import app
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache. An entry expires after `ttl` seconds, or as soon
+    as the data version it was stored under is no longer the current one. With
+    `max_entries`, the least recently used entries are evicted beyond that size.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = None) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        # lookup counters, see info()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, version):
+        """
+        Get a cached value.
+
+        Args:
+            key (hashable): The cache key.
+            version (int): The current data version.
+
+        Returns:
+            The cached value, or None if it is missing, expired or stale.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, entry_version, expires_at = entry
+            if entry_version != version or expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        return value
+
+    def set(self, key, value, version) -> None:
+        """
+        Store a value in the cache.
+
+        Args:
+            key (hashable): The cache key.
+            value: The value to cache, must not be None.
+            version (int): The data version the value was computed from.
+        """
+        with self._lock:
+            self._entries[key] = (value, version, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+
+            if self.max_entries is not None:
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Drop every entry from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def info(self) -> dict:
+        """
+        Get the size and lookup counters of the cache.
+
+        Returns:
+            dict: The number of entries, hits, misses and evictions.
+        """
+        with self._lock:
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def dump_value(value) -> str:
+    """
+    Serialize a cache value to JSON, with bytes stored as tagged base64 strings.
+    Values are never unpickled, so whoever can write the cache file can at worst
+    corrupt cached data.
+
+    Args:
+        value: A JSON compatible value, possibly holding bytes.
+
+    Returns:
+        str: The JSON text.
+    """
+
+    def encode(item):
+        if isinstance(item, bytes):
+            return {"__bytes__": base64.b64encode(item).decode()}
+        raise TypeError(f"cannot cache values of type {type(item).__name__}")
+
+    return json.dumps(value, default=encode)
+
+
+def load_value(text: str):
+    """
+    Deserialize a cache value written by dump_value.
+
+    Args:
+        text (str): The JSON text.
+
+    Returns:
+        The cached value. Dictionary keys come back as strings.
+    """
+
+    def decode(item: dict):
+        if item.keys() == {"__bytes__"}:
+            return base64.b64decode(item["__bytes__"])
+        return item
+
+    return json.loads(text, object_hook=decode)
+
+
+class SQLiteCache:
+    """
+    Cache shared by every worker process of a host, stored in a SQLite file. Same
+    interface and expiry rules as TTLCache, with every cache of the app stored under
+    its own namespace in one table.
+
+    Invalidation is versioned: a lookup only matches entries stored under the
+    current data version, so a version bump invalidates them in every worker at
+    once. Writes run in one transaction that also purges the namespace's entries of
+    older versions. With `max_entries`, the least recently used entries are evicted
+    beyond that size. Values are stored as JSON, see dump_value. Failures of the
+    store are reported and behave like misses.
+    """
+
+    def __init__(self, path: str, namespace: str, ttl: float, max_entries=None):
+        self.path = path
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        # lookup counters of this worker, see info()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Get the connection of the current thread, opened on first use so that no
+        connection is inherited across a fork.
+        """
+        if getattr(self._local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, version INTEGER NOT NULL, "
+                "expires_at REAL NOT NULL, value BLOB NOT NULL, "
+                "accessed_at REAL NOT NULL DEFAULT 0, PRIMARY KEY (namespace, key))"
+            )
+            columns = connection.execute("PRAGMA table_info(cache_entries)")
+            if "accessed_at" not in {column[1] for column in columns}:
+                # files written before entries tracked their last use
+                connection.execute(
+                    "ALTER TABLE cache_entries "
+                    "ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0"
+                )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_cache_entries_version "
+                "ON cache_entries (namespace, version)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_cache_entries_accessed_at "
+                "ON cache_entries (namespace, accessed_at)"
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+
+        return self._local.connection
+
+    @staticmethod
+    def _key(key) -> str:
+        """
+        Map a hashable key to its text form in the store.
+        """
+        return hashlib.sha256(repr(key).encode()).hexdigest()
+
+    def get(self, key, version):
+        """
+        Get a cached value.
+
+        Args:
+            key (hashable): The cache key, its repr must be stable across processes.
+            version (int): The current data version.
+
+        Returns:
+            The cached value, or None if it is missing, expired or stale.
+        """
+        now = time.time()
+        try:
+            connection = self._connection()
+            row = connection.execute(
+                "SELECT value FROM cache_entries WHERE namespace = ? AND key = ? "
+                "AND version = ? AND expires_at > ?",
+                (self.namespace, self._key(key), version, now),
+            ).fetchone()
+            value = None if row is None else load_value(row[0])
+            if value is not None:
+                # the eviction order, see set
+                connection.execute(
+                    "UPDATE cache_entries SET accessed_at = ? "
+                    "WHERE namespace = ? AND key = ?",
+                    (now, self.namespace, self._key(key)),
+                )
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Error reading the {self.namespace} cache: {e}", file=sys.stderr)
+            value = None
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return value
+
+    def set(self, key, value, version) -> None:
+        """
+        Store a value in the cache.
+
+        Args:
+            key (hashable): The cache key, its repr must be stable across processes.
+            value: The value to cache, must not be None and must be JSON compatible
+                apart from bytes.
+            version (int): The data version the value was computed from.
+        """
+        try:
+            connection = self._connection()
+            text = dump_value(value)
+        except (sqlite3.Error, TypeError) as e:
+            print(f"Error writing the {self.namespace} cache: {e}", file=sys.stderr)
+            return
+
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND version < ?",
+                (self.namespace, version),
+            )
+            now = time.time()
+            connection.execute(
+                "INSERT OR REPLACE INTO cache_entries "
+                "(namespace, key, version, expires_at, value, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, self._key(key), version, now + self.ttl, text, now),
+            )
+            if self.max_entries is not None:
+                evicted = connection.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+                    "SELECT key FROM cache_entries WHERE namespace = ? "
+                    "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.namespace, self.namespace, self.max_entries),
+                )
+                with self._lock:
+                    self.evictions += evicted.rowcount
+            connection.execute("COMMIT")
+        except sqlite3.Error as e:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            print(f"Error writing the {self.namespace} cache: {e}", file=sys.stderr)
+
+    def clear(self) -> None:
+        """
+        Drop every entry of the namespace, for all workers.
+        """
+        try:
+            self._connection().execute(
+                "DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,)
+            )
+        except sqlite3.Error as e:
+            print(f"Error clearing the {self.namespace} cache: {e}", file=sys.stderr)
+
+    def info(self) -> dict:
+        """
+        Get the size of the cache and the lookup counters of this worker.
+
+        Returns:
+            dict: The number of entries, hits, misses and evictions.
+        """
+        try:
+            (entries,) = (
+                self._connection()
+                .execute(
+                    "SELECT count(*) FROM cache_entries WHERE namespace = ?",
+                    (self.namespace,),
+                )
+                .fetchone()
+            )
+        except sqlite3.Error as e:
+            print(f"Error reading the {self.namespace} cache: {e}", file=sys.stderr)
+            entries = None
+
+        with self._lock:
+            return {
+                "backend": "sqlite",
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+CACHE_BACKENDS = ("memory", "sqlite")
+
+
+def default_cache_path() -> str:
+    """
+    Get the cache file used when CACHE_PATH is not set, in a directory only the
+    user running the app can access, so no other local user can plant or rewrite
+    it.
+
+    Returns:
+        str: The path of the cache file.
+
+    Raises:
+        PermissionError: If the directory exists but is not private to the user.
+    """
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    directory = os.path.join(base, "riks-flix")
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    status = os.lstat(directory)
+    if (
+        not stat.S_ISDIR(status.st_mode)
+        or status.st_uid != os.getuid()
+        or status.st_mode & 0o077
+    ):
+        raise PermissionError(f"cache directory {directory} must be private (0700)")
+
+    return os.path.join(directory, "cache.sqlite3")
+
+
+def create_cache(namespace: str, ttl: float, max_entries: int = None):
+    """
+    Create a cache on the backend selected by the CACHE_BACKEND setting: "memory"
+    for a cache private to the worker, "sqlite" for one shared by the workers of
+    the host through the CACHE_PATH file (see default_cache_path when unset).
+
+    Args:
+        namespace (str): The name of the cache, unique within the app.
+        ttl (float): Seconds an entry stays cached.
+        max_entries (int): The maximum number of entries, None for no bound.
+
+    Returns:
+        TTLCache or SQLiteCache: The cache.
+    """
+    backend = app.config["CACHE_BACKEND"]
+    if backend == "sqlite":
+        path = app.config["CACHE_PATH"] or default_cache_path()
+        return SQLiteCache(path, namespace, ttl, max_entries)
+    if backend == "memory":
+        return TTLCache(ttl, max_entries)
+
+    raise ValueError(f"unknown cache backend {backend!r}, expected {CACHE_BACKENDS}")
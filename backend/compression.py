@@ -0,0 +1,143 @@
+import gzip
+from app_init import app
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional dependency, responses are only gzip compressed
+    brotli = None
+
+# compression settings, favoring speed since most bodies are compressed per request
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# content encoding -> compression function, in order of preference
+ENCODINGS = {"gzip": lambda body: gzip.compress(body, GZIP_LEVEL, mtime=0)}
+if brotli is not None:
+    ENCODINGS = {
+        "br": lambda body: brotli.compress(body, quality=BROTLI_QUALITY),
+        **ENCODINGS,
+    }
+
+# response types worth compressing
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/plain", "text/html"}
+
+
+def negotiate_encoding(available) -> str:
+    """
+    Pick the content encoding of the current request's response from its
+    Accept-Encoding header.
+
+    Args:
+        available (iterable): The encodings the response is available in.
+
+    Returns:
+        str or None: The best accepted encoding, None to send the body as is.
+    """
+    available = [encoding for encoding in ENCODINGS if encoding in available]
+
+    return request.accept_encodings.best_match(available)
+
+
+def compress_variants(body: bytes) -> dict:
+    """
+    Compress a response body in every supported encoding, for caches storing
+    responses ready to be sent to any client. Bodies under COMPRESSION_MIN_SIZE
+    are kept uncompressed only.
+
+    Args:
+        body (bytes): The uncompressed body.
+
+    Returns:
+        dict: Content encoding -> body, "identity" for the uncompressed one.
+    """
+    variants = {"identity": body}
+    if len(body) >= app.config["COMPRESSION_MIN_SIZE"]:
+        for encoding, compress in ENCODINGS.items():
+            variants[encoding] = compress(body)
+
+    return variants
+
+
+def variant_response(variants: dict):
+    """
+    Build the response of the current request from precompressed variants, in the
+    best encoding the client accepts.
+
+    Args:
+        variants (dict): Content encoding -> body, see compress_variants.
+
+    Returns:
+        Flask Response: The JSON response.
+    """
+    response = app.response_class(variants["identity"], mimetype=app.json.mimetype)
+
+    encoding = negotiate_encoding(variants)
+    if encoding is not None:
+        response.set_data(variants[encoding])
+        response.content_encoding = encoding
+
+    return response
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """
+    The ETag of a response body in a content encoding, as every encoding of a body
+    is a different representation.
+
+    Args:
+        etag (str): The ETag value of the uncompressed body.
+        encoding (str): The content encoding, "identity" for the uncompressed body.
+
+    Returns:
+        str: The ETag value of the encoded body.
+    """
+    if encoding == "identity":
+        return etag
+
+    return f"{etag}-{encoding}"
+
+
+def compress_response(response):
+    """
+    After request hook compressing the bodies of at least COMPRESSION_MIN_SIZE bytes
+    in the best encoding the client accepts. Precompressed responses are left as
+    they are. The ETag of an encoded body names its encoding, see encoded_etag,
+    and 304 responses get the same Vary as the 200 they stand for.
+
+    Args:
+        response (Flask Response): The response to the current request.
+
+    Returns:
+        Flask Response: The possibly compressed response.
+    """
+    if response.direct_passthrough or (
+        response.status_code != 304
+        and (
+            response.status_code != 200
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        )
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    if response.status_code == 304:
+        return response
+
+    if response.content_encoding is None:
+        body = response.get_data()
+        if len(body) < app.config["COMPRESSION_MIN_SIZE"]:
+            return response
+
+        encoding = negotiate_encoding(ENCODINGS)
+        if encoding is None:
+            return response
+
+        response.set_data(ENCODINGS[encoding](body))
+        response.content_encoding = encoding
+
+    etag, weak = response.get_etag()
+    if etag is not None:
+        response.set_etag(encoded_etag(etag, response.content_encoding), weak)
+
+    return response
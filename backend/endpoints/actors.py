@@ -1,11 +1,30 @@
 from models.actors import Actor
 from flask import Blueprint, request
 from schema.actors_schema import actors_schema, actor_schema
+from models.directors import Director
+from schema.directors_schema import directors_schema
+from models.associations import actor_director_collaborations
+from name_index import (
+    apply_fuzzy_search,
+    apply_fuzzy_ranking,
+    fuzzy_search_truncated,
+)
+from endpoints.movies import get_related_movies
 from utils import (
+    Status,
+    conditional_response,
+    data_version_validators,
+    instance_validators,
+    cached_response,
     query_pages,
     query_by_id,
+    query_batch,
+    query_collaborators,
     apply_search_filters,
+    apply_search_ranking,
     parse_sort_parameters,
+    parse_batch_parameters,
+    parse_fields_parameter,
     parse_pagination_parameters,
 )
 
@@ -13,9 +32,13 @@ actors = Blueprint("actors", __name__)
 
 
 @actors.route("/actors", methods=["GET"])
+@conditional_response(data_version_validators, weak=True)
+@cached_response
 def get_actors() -> dict:
     """
-    Get a list of actors with pagination.
+    Get a list of actors with pagination. Fuzzy searches (?fuzzy=true) keep the
+    FUZZY_MAX_MATCHES closest matches, the data is flagged "truncated" when there
+    are more.
 
     Returns:
         dict: A dictionary containing the status and data of the query.
@@ -29,18 +52,63 @@ def get_actors() -> dict:
         Actor.name,
     ]
 
+    fields = parse_fields_parameter(request.args, actors_schema)
+    if fields is None:
+        return {**Status.FAIL.value, "message": "invalid fields"}
+
     page_info = parse_pagination_parameters(request.args)
     sort_info = parse_sort_parameters(request.args, SORT_FIELDS)
     search_info = request.args.get("search", None)
+    fuzzy = request.args.get("fuzzy", "false").lower() == "true"
 
     base_query = Actor.query
     if search_info is not None:
-        base_query = apply_search_filters(base_query, search_info, SEARCH_FIELDS)
-    base_query = base_query.order_by(
-        sort_info if sort_info is not None else Actor.id, Actor.id
+        if fuzzy:
+            base_query = apply_fuzzy_search(base_query, search_info, SEARCH_FIELDS)
+        else:
+            base_query = apply_search_filters(base_query, search_info, SEARCH_FIELDS)
+    if sort_info is None:
+        # without an explicit sort, searches list the best matches first
+        if fuzzy:
+            base_query = apply_fuzzy_ranking(base_query, search_info, SEARCH_FIELDS)
+        else:
+            base_query = apply_search_ranking(base_query, search_info, SEARCH_FIELDS)
+        sort_info = Actor.id.asc()
+    base_query = base_query.order_by(sort_info, Actor.id)
+
+    result = query_pages(
+        base_query, actors_schema, page_info, sort_info, Actor.id, fields
     )
 
-    result = query_pages(base_query, actors_schema, page_info)
+    if result["status"] == "success":
+        result["data"]["actors"] = result["data"].pop("instances")
+        if fuzzy and fuzzy_search_truncated(search_info, SEARCH_FIELDS):
+            result["data"]["truncated"] = True
+
+    return result
+
+
+@actors.route("/actors/batch", methods=["GET"])
+@conditional_response(data_version_validators, weak=True)
+@cached_response
+def get_actors_batch() -> dict:
+    """
+    Get up to BATCH_MAX_SIZE actors by ids (?ids=1,2,3) or slugs (?slugs=a,b) in a
+    single query, in the requested order, with the ids or slugs that matched no
+    actor.
+
+    Returns:
+        dict: A dictionary containing the status and data of the query.
+    """
+    batch = parse_batch_parameters(request.args)
+    if batch is None:
+        return {**Status.FAIL.value, "message": "invalid batch"}
+
+    fields = parse_fields_parameter(request.args, actors_schema)
+    if fields is None:
+        return {**Status.FAIL.value, "message": "invalid fields"}
+
+    result = query_batch(Actor, *batch, actors_schema, fields)
 
     if result["status"] == "success":
         result["data"]["actors"] = result["data"].pop("instances")
@@ -49,10 +117,52 @@ def get_actors() -> dict:
 
 
 @actors.route("/actors/<string:id>", methods=["GET"])
+@conditional_response(instance_validators(Actor))
 def get_actor(id: str) -> dict:
-    result = query_by_id(Actor, id, actor_schema)
+    fields = parse_fields_parameter(request.args, actor_schema)
+    if fields is None:
+        return {**Status.FAIL.value, "message": "invalid fields"}
+
+    result = query_by_id(Actor, id, actor_schema, fields)
 
     if result["status"] == "success":
         result["data"]["actor"] = result["data"].pop("instance")
 
     return result
+
+
+@actors.route("/actors/<string:id>/collaborators", methods=["GET"])
+@conditional_response(data_version_validators, weak=True)
+def get_actor_collaborators(id: str) -> dict:
+    """
+    Get the directors an actor worked with, most collaborations first.
+
+    Returns:
+        dict: A dictionary containing the status and data of the query.
+    """
+    page_info = parse_pagination_parameters(request.args)
+
+    return query_collaborators(
+        Actor,
+        id,
+        Director,
+        actor_director_collaborations.c.actor_id,
+        actor_director_collaborations.c.director_id,
+        actor_director_collaborations.c.collaborations,
+        directors_schema,
+        page_info,
+    )
+
+
+@actors.route("/actors/<string:id>/movies", methods=["GET"])
+@conditional_response(instance_validators(Actor, ["movies"]))
+@cached_response
+def get_actor_movies(id: str) -> dict:
+    """
+    Get the movies of an actor, with pagination, sort (release_year, rating) and
+    the range filters of /movies.
+
+    Returns:
+        dict: A dictionary containing the status and data of the query.
+    """
+    return get_related_movies(Actor, id)
@@ -0,0 +1,44 @@
+import sys
+from utils import Status
+from flask import Blueprint, request
+from name_index import INDEXED_TYPES, MAX_SUGGESTIONS, get_name_index
+
+autocomplete = Blueprint("autocomplete", __name__)
+
+
+@autocomplete.route("/autocomplete", methods=["GET"])
+def get_autocomplete() -> dict:
+    """
+    Suggest movies, actors and directors whose name starts with the typed prefix,
+    answered from the in-process name index.
+
+    Query parameters: q (the prefix), limit (1 to 50, defaults to 10) and types
+    (comma separated subset of movie, actor and director).
+
+    Returns:
+        dict: A dictionary containing the status and the suggestions.
+    """
+    prefix = request.args.get("q", "").strip()
+    if not prefix:
+        return {**Status.FAIL.value, "message": "missing q"}
+
+    try:
+        limit = int(request.args.get("limit", 10))
+    except ValueError:
+        return {**Status.FAIL.value, "message": "invalid limit"}
+    if not 1 <= limit <= MAX_SUGGESTIONS:
+        return {**Status.FAIL.value, "message": "invalid limit"}
+
+    types = None
+    if request.args.get("types"):
+        types = set(request.args["types"].split(","))
+        if not types <= INDEXED_TYPES.keys():
+            return {**Status.FAIL.value, "message": "invalid types"}
+
+    try:
+        suggestions = get_name_index().lookup(prefix, limit, types)
+    except Exception as e:
+        print(f"Error building the name index: {e}", file=sys.stderr)
+        return {**Status.ERROR.value, "message": "index unavailable"}
+
+    return {**Status.SUCCESS.value, "data": {"suggestions": suggestions}}
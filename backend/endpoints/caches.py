@@ -0,0 +1,23 @@
+from flask import Blueprint
+from endpoints.stats import stats_cache
+from utils import Status, response_cache, count_cache
+
+caches = Blueprint("caches", __name__)
+
+
+@caches.route("/caches", methods=["GET"])
+def get_caches() -> dict:
+    """
+    Get the size and hit/miss counters of the in-process caches of this worker.
+
+    Returns:
+        dict: A dictionary containing the status and the counters of every cache.
+    """
+    return {
+        **Status.SUCCESS.value,
+        "data": {
+            "responses": response_cache.info(),
+            "counts": count_cache.info(),
+            "stats": stats_cache.info(),
+        },
+    }
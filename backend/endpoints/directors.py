@@ -1,11 +1,30 @@
 from flask import Blueprint, request
 from models.directors import Director
 from schema.directors_schema import directors_schema, director_schema
+from models.actors import Actor
+from schema.actors_schema import actors_schema
+from models.associations import actor_director_collaborations
+from name_index import (
+    apply_fuzzy_search,
+    apply_fuzzy_ranking,
+    fuzzy_search_truncated,
+)
+from endpoints.movies import get_related_movies
 from utils import (
+    Status,
+    conditional_response,
+    data_version_validators,
+    instance_validators,
+    cached_response,
     query_pages,
     query_by_id,
+    query_batch,
+    query_collaborators,
     apply_search_filters,
+    apply_search_ranking,
     parse_sort_parameters,
+    parse_batch_parameters,
+    parse_fields_parameter,
     parse_pagination_parameters,
 )
 
@@ -13,9 +32,13 @@ directors = Blueprint("directors", __name__)
 
 
 @directors.route("/directors", methods=["GET"])
+@conditional_response(data_version_validators, weak=True)
+@cached_response
 def get_actors() -> dict:
     """
-    Get a list of directors with pagination.
+    Get a list of directors with pagination. Fuzzy searches (?fuzzy=true) keep the
+    FUZZY_MAX_MATCHES closest matches, the data is flagged "truncated" when there
+    are more.
 
     Returns:
         dict: A dictionary containing the status and data of the query.
@@ -29,18 +52,63 @@ def get_actors() -> dict:
         Director.name,
     ]
 
+    fields = parse_fields_parameter(request.args, directors_schema)
+    if fields is None:
+        return {**Status.FAIL.value, "message": "invalid fields"}
+
     page_info = parse_pagination_parameters(request.args)
     sort_info = parse_sort_parameters(request.args, SORT_FIELD)
     search_field = request.args.get("search", None)
+    fuzzy = request.args.get("fuzzy", "false").lower() == "true"
 
     base_query = Director.query
     if search_field is not None:
-        base_query = apply_search_filters(base_query, search_field, SEARCH_FIELD)
-    base_query = base_query.order_by(
-        sort_info if sort_info is not None else Director.id, Director.id
+        if fuzzy:
+            base_query = apply_fuzzy_search(base_query, search_field, SEARCH_FIELD)
+        else:
+            base_query = apply_search_filters(base_query, search_field, SEARCH_FIELD)
+    if sort_info is None:
+        # without an explicit sort, searches list the best matches first
+        if fuzzy:
+            base_query = apply_fuzzy_ranking(base_query, search_field, SEARCH_FIELD)
+        else:
+            base_query = apply_search_ranking(base_query, search_field, SEARCH_FIELD)
+        sort_info = Director.id.asc()
+    base_query = base_query.order_by(sort_info, Director.id)
+
+    result = query_pages(
+        base_query, directors_schema, page_info, sort_info, Director.id, fields
     )
 
-    result = query_pages(base_query, directors_schema, page_info)
+    if result["status"] == "success":
+        result["data"]["directors"] = result["data"].pop("instances")
+        if fuzzy and fuzzy_search_truncated(search_field, SEARCH_FIELD):
+            result["data"]["truncated"] = True
+
+    return result
+
+
+@directors.route("/directors/batch", methods=["GET"])
+@conditional_response(data_version_validators, weak=True)
+@cached_response
+def get_directors_batch() -> dict:
+    """
+    Get up to BATCH_MAX_SIZE directors by ids (?ids=1,2,3) or slugs (?slugs=a,b) in a
+    single query, in the requested order, with the ids or slugs that matched no
+    director.
+
+    Returns:
+        dict: A dictionary containing the status and data of the query.
+    """
+    batch = parse_batch_parameters(request.args)
+    if batch is None:
+        return {**Status.FAIL.value, "message": "invalid batch"}
+
+    fields = parse_fields_parameter(request.args, directors_schema)
+    if fields is None:
+        return {**Status.FAIL.value, "message": "invalid fields"}
+
+    result = query_batch(Director, *batch, directors_schema, fields)
 
     if result["status"] == "success":
         result["data"]["directors"] = result["data"].pop("instances")
@@ -49,10 +117,52 @@ def get_actors() -> dict:
 
 
 @directors.route("/directors/<string:id>", methods=["GET"])
+@conditional_response(instance_validators(Director))
 def get_actor(id: str) -> dict:
-    result = query_by_id(Director, id, director_schema)
+    fields = parse_fields_parameter(request.args, director_schema)
+    if fields is None:
+        return {**Status.FAIL.value, "message": "invalid fields"}
+
+    result = query_by_id(Director, id, director_schema, fields)
 
     if result["status"] == "success":
         result["data"]["directors"] = result["data"].pop("instance")
 
     return result
+
+
+@directors.route("/directors/<string:id>/collaborators", methods=["GET"])
+@conditional_response(data_version_validators, weak=True)
+def get_director_collaborators(id: str) -> dict:
+    """
+    Get the actors a director worked with, most collaborations first.
+
+    Returns:
+        dict: A dictionary containing the status and data of the query.
+    """
+    page_info = parse_pagination_parameters(request.args)
+
+    return query_collaborators(
+        Director,
+        id,
+        Actor,
+        actor_director_collaborations.c.director_id,
+        actor_director_collaborations.c.actor_id,
+        actor_director_collaborations.c.collaborations,
+        actors_schema,
+        page_info,
+    )
+
+
+@directors.route("/directors/<string:id>/movies", methods=["GET"])
+@conditional_response(instance_validators(Director, ["movies"]))
+@cached_response
+def get_director_movies(id: str) -> dict:
+    """
+    Get the movies of a director, with pagination, sort (release_year, rating) and
+    the range filters of /movies.
+
+    Returns:
+        dict: A dictionary containing the status and data of the query.
+    """
+    return get_related_movies(Director, id)
@@ -0,0 +1,24 @@
+from models.genres import Genre
+from flask import Blueprint
+from utils import (
+    cached_response,
+    conditional_response,
+    instance_validators,
+)
+from endpoints.movies import get_related_movies
+
+genres = Blueprint("genres", __name__)
+
+
+@genres.route("/genres/<string:id>/movies", methods=["GET"])
+@conditional_response(instance_validators(Genre, ["movies"]))
+@cached_response
+def get_genre_movies(id: str) -> dict:
+    """
+    Get the movies of a genre, with pagination, sort (release_year, rating) and the
+    range filters of /movies.
+
+    Returns:
+        dict: A dictionary containing the status and data of the query.
+    """
+    return get_related_movies(Genre, id)
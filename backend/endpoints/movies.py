@@ -1,50 +1,114 @@
+import sys
 from models.movies import Movie
+from models.genres import Genre
+from models.actors import Actor
+from models.directors import Director
+from sqlalchemy import case
 from flask import Blueprint, request
+from endpoints.stats import RATING_BINS
+from models.associations import movie_genres, movie_actors, movie_directors
 from schema.genres_schema import genres_schema
 from schema.actors_schema import actors_schema
 from schema.directors_schema import directors_schema
 from schema.movies_schema import movies_schema, movie_schema
+from name_index import (
+    apply_fuzzy_search,
+    apply_fuzzy_ranking,
+    fuzzy_search_truncated,
+)
 from utils import (
+    Status,
+    conditional_response,
+    data_version_validators,
+    instance_validators,
+    cached_response,
     query_pages,
+    query_facets,
     query_by_id,
+    query_batch,
     parse_exact_filters,
     apply_exact_filters,
     parse_range_filters,
     apply_range_filters,
+    parse_relation_filters,
+    apply_relation_filters,
     apply_search_filters,
+    apply_search_ranking,
     parse_sort_parameters,
     query_relations_by_id,
+    include_relations,
+    parse_include_parameter,
+    parse_batch_parameters,
+    parse_fields_parameter,
     parse_pagination_parameters,
 )
 
 
 movies = Blueprint("movies", __name__)
 
+# relations that ?include= can embed into movies
+INCLUDE_RELATIONS = {
+    "actors": actors_schema,
+    "directors": directors_schema,
+    "genres": genres_schema,
+}
+
+# filters of /movies, shared with /movies/facets
+EXACT_FILTERS = [
+    Movie.release_year,
+    Movie.mpaa_rating,
+]
+
+RANGE_FILTERS = [
+    Movie.duration,
+    Movie.release_year,
+    Movie.rating,
+]
+
+# parameter -> (association table, related model), values are slugs, ids under
+# the parameter with an "_id" suffix
+RELATION_FILTERS = {
+    "genre": (movie_genres, Genre),
+    "actor": (movie_actors, Actor),
+    "director": (movie_directors, Director),
+}
+
+SEARCH_FIELDS = [
+    Movie.title,
+]
+
+# facet -> SQL expression of a movie's value, genres need FACET_JOINS
+FACETS = {
+    "release_year": Movie.release_year,
+    "mpaa_rating": Movie.mpaa_rating,
+    "genre": Genre.slug,
+    "rating": case(
+        *(
+            (Movie.rating.between(low, high), label)
+            for label, (low, high) in RATING_BINS.items()
+        )
+    ),
+}
+
+FACET_JOINS = [
+    (movie_genres, movie_genres.c.movie_id == Movie.id),
+    (Genre, Genre.id == movie_genres.c.genre_id),
+]
+
 
 @movies.route("/movies", methods=["GET"])
+@conditional_response(data_version_validators, weak=True)
+@cached_response
 def get_movies() -> dict:
     """
-    Get a list of movies with pagination.
+    Get a list of movies with pagination. Fuzzy searches (?fuzzy=true) keep the
+    FUZZY_MAX_MATCHES closest matches, the data is flagged "truncated" when there
+    are more.
 
     Returns:
         dict: A dictionary containing the status and data of the query.
     """
 
-    EXACT_FILTERS = [
-        Movie.release_year,
-        Movie.mpaa_rating,
-    ]
-
-    RANGE_FILTERS = [
-        Movie.duration,
-        Movie.release_year,
-        Movie.rating,
-    ]
-
-    SEARCH_FIELDS = [
-        Movie.title,
-    ]
-
     SORT_FIELDS = [
         Movie.title,
         Movie.release_year,
@@ -52,22 +116,133 @@ def get_movies() -> dict:
         Movie.rating,
     ]
 
+    fields = parse_fields_parameter(request.args, movies_schema)
+    if fields is None:
+        return {**Status.FAIL.value, "message": "invalid fields"}
+
+    includes = parse_include_parameter(request.args, INCLUDE_RELATIONS)
+    if includes is None:
+        return {**Status.FAIL.value, "message": "invalid include"}
+    if includes and "id" not in fields:
+        # relations are embedded by movie id
+        fields = ("id", *fields)
+
+    base_query = filter_movies(request.args)
+    if base_query is None:
+        return {**Status.FAIL.value, "message": "invalid relation filters"}
+
     page_info = parse_pagination_parameters(request.args)
     sort_info = parse_sort_parameters(request.args, SORT_FIELDS)
-    exact_filters = parse_exact_filters(request.args, EXACT_FILTERS)
-    range_filters = parse_range_filters(request.args, RANGE_FILTERS)
     search_info = request.args.get("search", None)
+    fuzzy = request.args.get("fuzzy", "false").lower() == "true"
+
+    if sort_info is None:
+        # without an explicit sort, searches list the best matches first
+        if fuzzy:
+            base_query = apply_fuzzy_ranking(base_query, search_info, SEARCH_FIELDS)
+        else:
+            base_query = apply_search_ranking(base_query, search_info, SEARCH_FIELDS)
+        sort_info = Movie.id.asc()
+    base_query = base_query.order_by(sort_info, Movie.id)
+
+    result = query_pages(
+        base_query, movies_schema, page_info, sort_info, Movie.id, fields
+    )
+
+    if result["status"] == "success":
+        result["data"]["movies"] = result["data"].pop("instances")
+        if fuzzy and fuzzy_search_truncated(search_info, SEARCH_FIELDS):
+            result["data"]["truncated"] = True
+        try:
+            include_relations(Movie, result["data"]["movies"], includes)
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return {**Status.ERROR.value, "message": "data fetch failed"}
+
+    return result
+
+
+@movies.route("/movies/facets", methods=["GET"])
+@conditional_response(data_version_validators, weak=True)
+@cached_response
+def get_movie_facets() -> dict:
+    """
+    Count the movies matching the filters of /movies per release year, MPAA rating,
+    genre and rating bin, all from a single grouped query. Like /movies, the data is
+    flagged "truncated" when a fuzzy search matched more than FUZZY_MAX_MATCHES.
+
+    Returns:
+        dict: A dictionary containing the status and data of the query.
+    """
+    base_query = filter_movies(request.args)
+    if base_query is None:
+        return {**Status.FAIL.value, "message": "invalid relation filters"}
+
+    result = query_facets(base_query, Movie.id, FACETS, FACET_JOINS)
+
+    search_info = request.args.get("search", None)
+    fuzzy = request.args.get("fuzzy", "false").lower() == "true"
+    if result["status"] == "success" and fuzzy:
+        if fuzzy_search_truncated(search_info, SEARCH_FIELDS):
+            result["data"]["truncated"] = True
+
+    return result
+
+
+def filter_movies(request_args):
+    """
+    Build the unordered query of the movies matching the search, exact, range and
+    relation filters of a request.
+
+    Args:
+        request_args (dict): The request arguments containing filter parameters.
+
+    Returns:
+        SQLAlchemy Query or None: The filtered query, None if the relation filters
+            are invalid.
+    """
+    relation_filters = parse_relation_filters(request_args, RELATION_FILTERS)
+    if relation_filters is None:
+        return None
+
+    exact_filters = parse_exact_filters(request_args, EXACT_FILTERS)
+    range_filters = parse_range_filters(request_args, RANGE_FILTERS)
+    search_info = request_args.get("search", None)
+    fuzzy = request_args.get("fuzzy", "false").lower() == "true"
 
     base_query = Movie.query
     if search_info is not None:
-        base_query = apply_search_filters(base_query, search_info, SEARCH_FIELDS)
+        if fuzzy:
+            base_query = apply_fuzzy_search(base_query, search_info, SEARCH_FIELDS)
+        else:
+            base_query = apply_search_filters(base_query, search_info, SEARCH_FIELDS)
     base_query = apply_exact_filters(base_query, exact_filters)
     base_query = apply_range_filters(base_query, range_filters)
-    base_query = base_query.order_by(
-        sort_info if sort_info is not None else Movie.id, Movie.id
-    )
 
-    result = query_pages(base_query, movies_schema, page_info)
+    return apply_relation_filters(base_query, Movie, relation_filters)
+
+
+@movies.route("/movies/batch", methods=["GET"])
+@conditional_response(data_version_validators, weak=True)
+@cached_response
+def get_movies_batch() -> dict:
+    """
+    Get up to BATCH_MAX_SIZE movies by ids (?ids=1,2,3) or slugs (?slugs=a,b) in a
+    single query, in the requested order, with the ids or slugs that matched no
+    movie.
+
+    Returns:
+        dict: A dictionary containing the status and data of the query.
+    """
+    batch = parse_batch_parameters(request.args)
+    if batch is None:
+        return {**Status.FAIL.value, "message": "invalid batch"}
+
+    fields = parse_fields_parameter(request.args, movies_schema)
+    if fields is None:
+        return {**Status.FAIL.value, "message": "invalid fields"}
+
+    result = query_batch(Movie, *batch, movies_schema, fields)
 
     if result["status"] == "success":
         result["data"]["movies"] = result["data"].pop("instances")
@@ -76,31 +251,115 @@ def get_movies() -> dict:
 
 
 @movies.route("/movies/<string:id>", methods=["GET"])
+@conditional_response(instance_validators(Movie, include=INCLUDE_RELATIONS))
+@cached_response
 def get_movie(id: str) -> dict:
-    result = query_by_id(Movie, id, movie_schema)
+    fields = parse_fields_parameter(request.args, movie_schema)
+    if fields is None:
+        return {**Status.FAIL.value, "message": "invalid fields"}
+
+    includes = parse_include_parameter(request.args, INCLUDE_RELATIONS)
+    if includes is None:
+        return {**Status.FAIL.value, "message": "invalid include"}
+    if includes and "id" not in fields:
+        # relations are embedded by movie id
+        fields = ("id", *fields)
+
+    result = query_by_id(Movie, id, movie_schema, fields)
 
     if result["status"] == "success":
         result["data"]["movie"] = result["data"].pop("instance")
+        try:
+            include_relations(Movie, [result["data"]["movie"]], includes)
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return {**Status.ERROR.value, "message": "data fetch failed"}
 
     return result
 
 
 @movies.route("/movies/<string:id>/actors", methods=["GET"])
+@conditional_response(instance_validators(Movie, ["actors"]))
+@cached_response
 def get_movie_actors(id: str) -> dict:
-    result = query_relations_by_id(Movie, id, "actors", actors_schema)
-
-    return result
+    return get_movie_relation(id, "actors", actors_schema, [Actor.name])
 
 
 @movies.route("/movies/<string:id>/directors", methods=["GET"])
+@conditional_response(instance_validators(Movie, ["directors"]))
+@cached_response
 def get_movie_directors(id: str) -> dict:
-    result = query_relations_by_id(Movie, id, "directors", directors_schema)
-
-    return result
+    return get_movie_relation(id, "directors", directors_schema, [Director.name])
 
 
 @movies.route("/movies/<string:id>/genres", methods=["GET"])
+@conditional_response(instance_validators(Movie, ["genres"]))
+@cached_response
 def get_movie_genres(id: str) -> dict:
-    result = query_relations_by_id(Movie, id, "genres", genres_schema)
+    return get_movie_relation(id, "genres", genres_schema, [Genre.name])
 
-    return result
+
+def get_movie_relation(id: str, relation_name: str, schema, sort_fields) -> dict:
+    """
+    Get a movie's relation, with the sort and fields of the request. The relation
+    is paginated only when the request asks for a page, without page, per_page or
+    cursor the whole relation is returned.
+
+    Args:
+        id (str): The ID of the movie.
+        relation_name (str): The name of the relation.
+        schema (Marshmallow Schema): The schema of the related instances.
+        sort_fields (list): The fields the relation may be sorted by.
+
+    Returns:
+        dict: A dictionary containing the status and data of the query.
+    """
+    fields = parse_fields_parameter(request.args, schema)
+    if fields is None:
+        return {**Status.FAIL.value, "message": "invalid fields"}
+
+    page_info = None
+    if any(name in request.args for name in ("page", "per_page", "cursor")):
+        page_info = parse_pagination_parameters(request.args)
+    sort_info = parse_sort_parameters(request.args, sort_fields)
+
+    return query_relations_by_id(
+        Movie, id, relation_name, schema, page_info, sort_info, fields
+    )
+
+
+def get_related_movies(model, id: str) -> dict:
+    """
+    Get a page of the movies of an actor, director or genre, with the sort,
+    pagination, range filters and fields of the request.
+
+    Args:
+        model (SQLAlchemy Model): Actor, Director or Genre.
+        id (str): The ID of the actor, director or genre.
+
+    Returns:
+        dict: A dictionary containing the status and data of the query.
+    """
+
+    RANGE_FILTERS = [
+        Movie.duration,
+        Movie.release_year,
+        Movie.rating,
+    ]
+
+    SORT_FIELDS = [
+        Movie.release_year,
+        Movie.rating,
+    ]
+
+    fields = parse_fields_parameter(request.args, movies_schema)
+    if fields is None:
+        return {**Status.FAIL.value, "message": "invalid fields"}
+
+    page_info = parse_pagination_parameters(request.args)
+    sort_info = parse_sort_parameters(request.args, SORT_FIELDS)
+    range_filters = parse_range_filters(request.args, RANGE_FILTERS)
+
+    return query_relations_by_id(
+        model, id, "movies", movies_schema, page_info, sort_info, fields, range_filters
+    )
@@ -1,17 +1,82 @@
 import sys
-from app_init import db
-from utils import Status
-from flask import Blueprint
+import time
+from cache import create_cache
+from analytics import np, get_catalog, top_n, columnar_engine_available
+from app_init import db, app
+from flask import Blueprint, request
+from utils import (
+    Status,
+    get_data_version,
+    conditional_response,
+    data_version_validators,
+)
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from models.movies import Movie
 from models.actors import Actor
 from models.genres import Genre
 from collections import defaultdict
 from models.directors import Director
-from sqlalchemy import func, case, distinct
-from models.associations import movie_genres, movie_actors, movie_directors
+from sqlalchemy import func, case, distinct, tuple_
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from models.stats_snapshot import StatsSnapshot
+from models.associations import (
+    movie_genres,
+    movie_actors,
+    movie_directors,
+    actor_director_collaborations,
+)
 
 stats = Blueprint("stats", __name__)
 
+# bounded pool used by the parallel execution mode, every worker pushes its own
+# app context and therefore gets its own session and pooled connection
+stats_executor = ThreadPoolExecutor(
+    max_workers=app.config["STATS_MAX_WORKERS"], thread_name_prefix="stats"
+)
+
+# computed sections, each cached under its own key against the data version
+stats_cache = create_cache("stats", ttl=app.config["STATS_CACHE_TTL"])
+
+# columnar engine requested but numpy missing, fall back to SQL
+if app.config["STATS_ENGINE"] == "columnar" and not columnar_engine_available():
+    print("numpy is not installed, /stats falls back to SQL", file=sys.stderr)
+
+# rating bins, both bounds inclusive
+RATING_BINS = {
+    "<4": (0, 3.99),
+    "4-5.99": (4, 5.99),
+    "6-7.99": (6, 7.99),
+    "8-8.99": (8, 8.99),
+    "9+": (9, 10),
+}
+
+# extreme movies reported by the movie stats, ties are broken by id
+MOVIE_EXTREMES = {
+    "oldest_movie": Movie.release_year.asc(),
+    "newest_movie": Movie.release_year.desc(),
+    "longest_movie": Movie.duration.desc(),
+    "shortest_movie": Movie.duration.asc(),
+}
+
+
+def length_bracket(duration):
+    """
+    Build the SQL expression assigning a movie duration to its length bracket.
+
+    Args:
+        duration: The SQLAlchemy duration column.
+
+    Returns:
+        SQLAlchemy Case: The length bracket label expression.
+    """
+    return case(
+        (duration < 90, "< 90 min"),
+        (duration.between(90, 120), "90-120 min"),
+        (duration.between(120, 150), "120-150 min"),
+        (duration > 150, "> 150 min"),
+        else_="Unknown",
+    )
+
 
 def fetch_movie_by_order(order):
     """
@@ -23,7 +88,7 @@ def fetch_movie_by_order(order):
     Returns:
         Movie instance or None if no movie is found.
     """
-    movie = db.session.query(Movie).order_by(order).first()
+    movie = db.session.query(Movie).order_by(order, Movie.id).first()
 
     return (
         {
@@ -58,7 +123,7 @@ def fetch_top_rated_movies(limit: int = 10):
         }
         for movie in db.session.query(Movie)
         .filter(Movie.rating != None)
-        .order_by(Movie.rating.desc())
+        .order_by(Movie.rating.desc(), Movie.id)
         .limit(limit)
         .all()
     ]
@@ -72,17 +137,9 @@ def fetch_rating_distribution():
         dict: A dictionary with rating ranges as keys and counts as values.
     """
 
-    bins = {
-        "<4": (0, 3.99),
-        "4-5.99": (4, 5.99),
-        "6-7.99": (6, 7.99),
-        "8-8.99": (8, 8.99),
-        "9+": (9, 10),
-    }
-
     rating_distributions = dict()
 
-    for label, (low, high) in bins.items():
+    for label, (low, high) in RATING_BINS.items():
         count = (
             db.session.query(func.count(Movie.id))
             .filter(Movie.rating.between(low, high))
@@ -102,13 +159,7 @@ def fetch_length_brackets():
     """
     return dict(
         db.session.query(
-            case(
-                (Movie.duration < 90, "< 90 min"),
-                (Movie.duration.between(90, 120), "90-120 min"),
-                (Movie.duration.between(120, 150), "120-150 min"),
-                (Movie.duration > 150, "> 150 min"),
-                else_="Unknown",
-            ).label("length_group"),
+            length_bracket(Movie.duration).label("length_group"),
             func.count(Movie.id),
         )
         .group_by("length_group")
@@ -133,30 +184,50 @@ def fetch_avg_rating_by_year():
     }
 
 
-def fetch_actor_career_spans():
+def actor_career_spans_query():
     """
-    Fetch the career spans of actors.
+    Build the query ranking actors appearing in more than one movie by career span,
+    longest first. Span, ordering and limits are all evaluated by the database.
 
     Returns:
-        list: A list of Actor instances with their career spans.
+        SQLAlchemy Query: The career spans query.
     """
+    first_year = func.min(Movie.release_year)
+    last_year = func.max(Movie.release_year)
+    career_span = func.coalesce(last_year, 0) - func.coalesce(first_year, 0)
+
     return (
         db.session.query(
             Actor.id,
             Actor.name,
             Actor.photo_url,
             Actor.slug,
-            func.min(Movie.release_year).label("first_year"),
-            func.max(Movie.release_year).label("last_year"),
+            first_year.label("first_year"),
+            last_year.label("last_year"),
+            career_span.label("career_span"),
         )
         .join(movie_actors, Actor.id == movie_actors.c.actor_id)
         .join(Movie, movie_actors.c.movie_id == Movie.id)
         .group_by(Actor.id)
         .having(func.count(Movie.id) > 1)
-        .all()
+        .order_by(career_span.desc(), Actor.id)
     )
 
 
+def fetch_actor_career_spans(limit: int = 10, offset: int = 0):
+    """
+    Fetch the actors with the longest career spans.
+
+    Args:
+        limit (int): Number of actors to fetch. Defaults to 10.
+        offset (int): Number of actors to skip. Defaults to 0.
+
+    Returns:
+        list: A list of rows with the actors' details and career spans.
+    """
+    return actor_career_spans_query().limit(limit).offset(offset).all()
+
+
 def fetch_most_frequent_actors(limit: int = 10):
     """
     Fetch the most frequently appearing actors in movies.
@@ -188,10 +259,10 @@ def fetch_most_frequent_actors(limit: int = 10):
 
 def format_longest_career_actor(actor):
     """
-    Format the longest career actor's details.
+    Format an actor's career span details.
 
     Args:
-        actor (Actor): The actor with the longest career span.
+        actor (Row): A row of the career spans query.
 
     Returns:
         dict: A dictionary containing the actor's details.
@@ -200,7 +271,7 @@ def format_longest_career_actor(actor):
     return (
         {
             "name": actor.name,
-            "career_span": actor.last_year - actor.first_year,
+            "career_span": actor.career_span,
             "from": actor.first_year,
             "to": actor.last_year,
             "id": actor.id,
@@ -340,7 +411,8 @@ def fetch_popularity_over_time():
 def fetch_popular_pairings(limit: int = 5) -> list:
     """
     Fetch pairs of actors and directors who have collaborated frequently.
-    This function retrieves the top actor-director pairs based on the number of collaborations.
+    This function retrieves the top actor-director pairs from the maintained
+    actor_director_collaborations table, an index scan on the collaboration count.
 
     Args:
         limit (int): Number of top actor-director pairs to fetch. Defaults to 5.
@@ -359,15 +431,17 @@ def fetch_popular_pairings(limit: int = 5) -> list:
             Director.name,
             Director.photo_url,
             Director.slug,
-            func.count(Movie.id).label("collaborations"),
+            actor_director_collaborations.c.collaborations,
+        )
+        .select_from(actor_director_collaborations)
+        .join(Actor, actor_director_collaborations.c.actor_id == Actor.id)
+        .join(Director, actor_director_collaborations.c.director_id == Director.id)
+        .filter(actor_director_collaborations.c.collaborations > 1)
+        .order_by(
+            actor_director_collaborations.c.collaborations.desc(),
+            Actor.id,
+            Director.id,
         )
-        .join(movie_actors, Actor.id == movie_actors.c.actor_id)
-        .join(Movie, movie_actors.c.movie_id == Movie.id)
-        .join(movie_directors, Movie.id == movie_directors.c.movie_id)
-        .join(Director, movie_directors.c.director_id == Director.id)
-        .group_by(Actor.id, Director.id)
-        .order_by(func.count(Movie.id).desc())
-        .having(func.count(Movie.id) > 1)
         .limit(limit)
         .all()
     )
@@ -402,6 +476,123 @@ def fetch_popular_pairings(limit: int = 5) -> list:
     ]
 
 
+def fetch_movie_aggregates(top_rated_limit: int = 10) -> list:
+    """
+    Compute every movie aggregate in a single statement and a single scan of movies.
+
+    Window functions rank each extreme once, then one GROUP BY GROUPING SETS pass
+    yields the overall row alongside the per year, per MPAA rating and per length
+    bracket rows. Only the overall row carries the scalar stats of interest.
+
+    Args:
+        top_rated_limit (int): Number of top-rated movies to collect. Defaults to 10.
+
+    Returns:
+        list: The aggregate rows, one per grouping set group.
+    """
+    ranks = {
+        name: func.row_number().over(order_by=(order, Movie.id)).label(name)
+        for name, order in MOVIE_EXTREMES.items()
+    }
+    ranks["top_rated"] = (
+        func.row_number()
+        .over(order_by=(Movie.rating.desc().nulls_last(), Movie.id))
+        .label("top_rated")
+    )
+
+    movies = db.session.query(
+        Movie.id,
+        Movie.title,
+        Movie.release_year,
+        Movie.duration,
+        Movie.rating,
+        Movie.mpaa_rating,
+        Movie.slug,
+        Movie.poster_url,
+        length_bracket(Movie.duration).label("length_group"),
+        *ranks.values(),
+    ).subquery()
+
+    extremes = [
+        func.json_agg(
+            func.json_build_object(
+                "title",
+                movies.c.title,
+                "year",
+                movies.c.release_year,
+                "id",
+                movies.c.id,
+                "slug",
+                movies.c.slug,
+                "poster_url",
+                movies.c.poster_url,
+            )
+        )
+        .filter(movies.c[name] == 1)
+        .label(name)
+        for name in MOVIE_EXTREMES
+    ]
+
+    top_rated = (
+        func.json_agg(
+            aggregate_order_by(
+                func.json_build_object(
+                    "title",
+                    movies.c.title,
+                    "rating",
+                    movies.c.rating,
+                    "id",
+                    movies.c.id,
+                    "slug",
+                    movies.c.slug,
+                    "poster_url",
+                    movies.c.poster_url,
+                ),
+                movies.c.top_rated,
+            )
+        )
+        .filter(movies.c.rating != None, movies.c.top_rated <= top_rated_limit)
+        .label("top_rated")
+    )
+
+    rating_bins = [
+        func.count(movies.c.id)
+        .filter(movies.c.rating.between(low, high))
+        .label(f"rating_bin_{index}")
+        for index, (low, high) in enumerate(RATING_BINS.values())
+    ]
+
+    return (
+        db.session.query(
+            func.grouping(movies.c.release_year).label("all_years"),
+            func.grouping(movies.c.mpaa_rating).label("all_mpaa_ratings"),
+            func.grouping(movies.c.length_group).label("all_length_groups"),
+            movies.c.release_year,
+            movies.c.mpaa_rating,
+            movies.c.length_group,
+            func.count(movies.c.id).label("total"),
+            func.count(movies.c.rating).label("rated"),
+            func.avg(movies.c.rating).label("average_rating"),
+            func.avg(movies.c.duration).label("average_duration"),
+            func.percentile_cont(0.5)
+            .within_group(movies.c.duration)
+            .label("median_duration"),
+            *rating_bins,
+            *extremes,
+            top_rated,
+        )
+        .group_by(
+            func.grouping_sets(
+                tuple_(),
+                tuple_(movies.c.release_year),
+                tuple_(movies.c.mpaa_rating),
+                tuple_(movies.c.length_group),
+            )
+        )
+        .all()
+    )
+
+
 def fetch_movie_stats():
     """
     Fetch statistics about movies
@@ -410,6 +601,64 @@ def fetch_movie_stats():
         dict: A dictionary containing various movie statistics.
     """
 
+    try:
+        rows = fetch_movie_aggregates()
+    except Exception as e:
+        print(f"Error fetching movie stats: {e}", file=sys.stderr)
+        return None
+
+    overall = next(
+        row
+        for row in rows
+        if row.all_years and row.all_mpaa_ratings and row.all_length_groups
+    )
+
+    # same ordering as ORDER BY release_year, nulls last
+    by_year = sorted(
+        (row for row in rows if not row.all_years),
+        key=lambda row: (row.release_year is None, row.release_year or 0),
+    )
+
+    return {
+        "total": overall.total,
+        "movies_by_year": {row.release_year: row.total for row in by_year},
+        "oldest_movie": (overall.oldest_movie or [None])[0],
+        "newest_movie": (overall.newest_movie or [None])[0],
+        "average_duration": round(float(overall.average_duration or 0), 2),
+        "median_duration": overall.median_duration or 0,
+        "longest_movie": (overall.longest_movie or [None])[0],
+        "shortest_movie": (overall.shortest_movie or [None])[0],
+        "mpaa_distribution": {
+            row.mpaa_rating: row.total for row in rows if not row.all_mpaa_ratings
+        },
+        "rating_distribution": {
+            label: getattr(overall, f"rating_bin_{index}")
+            for index, label in enumerate(RATING_BINS)
+        },
+        "top_ratind_movies": [
+            {**movie, "rating": round(float(movie["rating"]), 2)}
+            for movie in overall.top_rated or []
+        ],
+        "length_brackets": {
+            row.length_group: row.total for row in rows if not row.all_length_groups
+        },
+        "average_rating_by_year": {
+            row.release_year: round(float(row.average_rating), 2)
+            for row in by_year
+            if row.rated
+        },
+    }
+
+
+def fetch_movie_stats_by_parts():
+    """
+    Fetch statistics about movies with one query per statistic. This is the reference
+    implementation the single scan in fetch_movie_stats is benchmarked against.
+
+    Returns:
+        dict: A dictionary containing various movie statistics.
+    """
+
     try:
         return {
             "total": db.session.query(func.count(Movie.id)).scalar(),
@@ -454,15 +703,7 @@ def fetch_actor_stats():
     """
 
     try:
-        career_spans = fetch_actor_career_spans()
-        longest_span_actor = (
-            max(
-                career_spans,
-                key=lambda x: (x.last_year or 0) - (x.first_year or 0),
-            )
-            if career_spans
-            else None
-        )
+        longest_span_actor = next(iter(fetch_actor_career_spans(limit=1)), None)
 
         return {
             "total": db.session.query(func.count(Actor.id)).scalar(),
@@ -529,31 +770,577 @@ def fetch_genre_stats():
         return None
 
 
-@stats.route("/stats", methods=["GET"])
-def get_stats():
-    """Get statistics about movies, actors, genres, and directors in the database.
+def fetch_display_rows(model, ids, *columns) -> dict:
+    """
+    Fetch the display columns of a handful of rows in a single query.
+
+    Args:
+        model (db.Model): The model to query.
+        ids (iterable): The ids of the rows.
+        *columns: The columns to fetch along with the id.
 
     Returns:
-        dict: A dictionary containing the status and statistics data.
+        dict: A dictionary with ids as keys and rows as values.
+    """
+    ids = [int(id) for id in ids]
+    if not ids:
+        return dict()
+
+    return {
+        row.id: row
+        for row in db.session.query(model.id, *columns).filter(model.id.in_(ids)).all()
+    }
+
+
+def fetch_movie_stats_columnar(catalog):
+    """
+    Fetch statistics about movies from the columnar catalog.
+
+    Args:
+        catalog (ColumnarCatalog): The catalog at the current data version.
+
+    Returns:
+        dict: A dictionary containing various movie statistics.
+    """
+    extremes = {
+        "oldest_movie": catalog.first_movie(catalog.release_year),
+        "newest_movie": catalog.first_movie(catalog.release_year, descending=True),
+        "longest_movie": catalog.first_movie(catalog.duration, descending=True),
+        "shortest_movie": catalog.first_movie(catalog.duration),
+    }
+    top_rated = catalog.top_rated(10)
+    movies = fetch_display_rows(
+        Movie,
+        [id for id in extremes.values() if id is not None] + top_rated,
+        Movie.title,
+        Movie.release_year,
+        Movie.rating,
+        Movie.slug,
+        Movie.poster_url,
+    )
+
+    return {
+        "total": len(catalog.movie_ids),
+        "movies_by_year": catalog.count_by_year(),
+        **{
+            name: (
+                {
+                    "title": movies[id].title,
+                    "year": movies[id].release_year,
+                    "id": id,
+                    "slug": movies[id].slug,
+                    "poster_url": movies[id].poster_url,
+                }
+                if id is not None
+                else None
+            )
+            for name, id in extremes.items()
+        },
+        "average_duration": round(float(catalog.average_duration() or 0), 2),
+        "median_duration": catalog.median_duration() or 0,
+        "mpaa_distribution": catalog.mpaa_distribution(),
+        "rating_distribution": catalog.count_between(catalog.rating, RATING_BINS),
+        "top_ratind_movies": [
+            {
+                "title": movies[id].title,
+                "rating": round(float(movies[id].rating), 2),
+                "id": id,
+                "slug": movies[id].slug,
+                "poster_url": movies[id].poster_url,
+            }
+            for id in top_rated
+        ],
+        "length_brackets": catalog.length_brackets(),
+        "average_rating_by_year": {
+            year: round(float(avg), 2)
+            for year, avg in catalog.average_rating_by_year().items()
+        },
+    }
+
+
+def fetch_people_ranking(model, links, positions, values, limit: int) -> list:
+    """
+    Rank actors or directors of the columnar catalog and fetch their display rows.
+
+    Args:
+        model (db.Model): Actor or Director.
+        links (LinkIndex): The catalog association of the model.
+        positions (np.ndarray): The candidate rows of the association.
+        values (np.ndarray): The value to rank each candidate by.
+        limit (int): Number of people to return.
+
+    Returns:
+        list: Tuples of the display row and the ranked position, best first.
+    """
+    ranked = top_n(values, limit, positions)
+    people = fetch_display_rows(
+        model, links.ids[ranked], model.name, model.slug, model.photo_url
+    )
+
+    return [(people[int(links.ids[position])], position) for position in ranked]
+
+
+def fetch_actor_stats_columnar(catalog):
+    """
+    Fetch statistics about actors from the columnar catalog.
+
+    Args:
+        catalog (ColumnarCatalog): The catalog at the current data version.
+
+    Returns:
+        dict: A dictionary containing various actor statistics.
     """
+    actors = catalog.actors
+
+    linked = np.flatnonzero(actors.counts > 0)
+    most_frequent = fetch_people_ranking(
+        Actor, actors, linked, actors.counts[linked], 10
+    )
+
+    # career spans of actors in more than one movie, unknown years count as 0
+    first = actors.reduce_movies(catalog.release_year, np.minimum, np.inf)
+    last = actors.reduce_movies(catalog.release_year, np.maximum, -np.inf)
+    first, last = np.where(np.isinf(first), 0, first), np.where(np.isinf(last), 0, last)
+    eligible = np.flatnonzero(actors.counts > 1)
+    longest = fetch_people_ranking(Actor, actors, eligible, (last - first)[eligible], 1)
+
+    return {
+        "total": len(actors.ids),
+        "most_frequent_actors": [
+            {
+                "name": actor.name,
+                "movie_count": int(actors.counts[position]),
+                "id": actor.id,
+                "slug": actor.slug,
+                "photo_url": actor.photo_url,
+            }
+            for actor, position in most_frequent
+        ],
+        "longest_career_actor": (
+            {
+                "name": longest[0][0].name,
+                "career_span": int(last[longest[0][1]] - first[longest[0][1]]),
+                "from": int(first[longest[0][1]]),
+                "to": int(last[longest[0][1]]),
+                "id": longest[0][0].id,
+                "slug": longest[0][0].slug,
+                "photo_url": longest[0][0].photo_url,
+            }
+            if longest
+            else None
+        ),
+    }
+
+
+def fetch_director_stats_columnar(catalog):
+    """
+    Fetch statistics about directors from the columnar catalog.
+
+    Args:
+        catalog (ColumnarCatalog): The catalog at the current data version.
+
+    Returns:
+        dict: A dictionary containing various director statistics.
+    """
+    directors = catalog.directors
+
+    linked = np.flatnonzero(directors.counts > 0)
+    most_prolific = fetch_people_ranking(
+        Director, directors, linked, directors.counts[linked], 10
+    )
+
+    rated_counts, averages = directors.rated_averages(catalog.rating)
+    eligible = np.flatnonzero(rated_counts >= 3)
+    highest_rated = fetch_people_ranking(
+        Director, directors, eligible, averages[eligible], 10
+    )
+
+    return {
+        "total": len(directors.ids),
+        "most_prolific": [
+            {
+                "name": director.name,
+                "movie_count": int(directors.counts[position]),
+                "id": director.id,
+                "slug": director.slug,
+                "photo_url": director.photo_url,
+            }
+            for director, position in most_prolific
+        ],
+        "highest_avg_rated": [
+            {
+                "name": director.name,
+                "avg_rating": round(float(averages[position]), 2),
+                "movie_count": int(rated_counts[position]),
+                "id": director.id,
+                "slug": director.slug,
+                "photo_url": director.photo_url,
+            }
+            for director, position in highest_rated
+        ],
+    }
+
+
+def fetch_genre_stats_columnar(catalog):
+    """
+    Fetch statistics about genres from the columnar catalog.
+
+    Args:
+        catalog (ColumnarCatalog): The catalog at the current data version.
+
+    Returns:
+        dict: A dictionary containing various genre statistics.
+    """
+    genres = catalog.genres
+    names = [catalog.genre_names[int(id)] for id in genres.ids]
+    by_name = sorted(range(len(names)), key=lambda position: names[position])
+
+    linked = np.flatnonzero(genres.counts > 0)
+
+    # genre x year matrix of movie counts
+    year_count = len(catalog.year_labels)
+    popularity = np.bincount(
+        genres.owners * year_count + catalog.year_codes[genres.movies],
+        minlength=len(genres.ids) * year_count,
+    ).reshape(len(genres.ids), year_count)
+
+    rated_counts, averages = genres.rated_averages(catalog.rating)
+
+    return {
+        "total": len(linked),
+        "most_common": [
+            {"name": names[position], "count": int(genres.counts[position])}
+            for position in top_n(genres.counts[linked], 5, linked)
+        ],
+        "popularity_over_time": {
+            names[position]: {
+                year: int(count)
+                for year, count in zip(catalog.year_labels, popularity[position])
+                if count
+            }
+            for position in by_name
+            if genres.counts[position]
+        },
+        "average_rating": {
+            names[position]: round(float(averages[position]), 2)
+            for position in by_name
+            if rated_counts[position]
+        },
+    }
+
+
+def fetch_popular_pairings_columnar(catalog, limit: int = 5) -> list:
+    """
+    Fetch pairs of actors and directors who have collaborated frequently, from the
+    columnar catalog.
+
+    Args:
+        catalog (ColumnarCatalog): The catalog at the current data version.
+        limit (int): Number of top actor-director pairs to fetch. Defaults to 5.
+
+    Returns:
+        list: A list of dictionaries containing actor and director details along with
+            their collaboration count.
+    """
+    pair_actors, pair_directors, counts = catalog.pairings()
+
+    repeated = np.flatnonzero(counts > 1)
+    ranked = top_n(counts[repeated], limit, repeated)
+
+    actor_ids = catalog.actors.ids[pair_actors[ranked]]
+    director_ids = catalog.directors.ids[pair_directors[ranked]]
+    actors = fetch_display_rows(
+        Actor, actor_ids, Actor.name, Actor.photo_url, Actor.slug
+    )
+    directors = fetch_display_rows(
+        Director, director_ids, Director.name, Director.photo_url, Director.slug
+    )
+
+    return [
+        {
+            "actor": {
+                "id": actors[int(actor_id)].id,
+                "name": actors[int(actor_id)].name,
+                "photo_url": actors[int(actor_id)].photo_url,
+                "slug": actors[int(actor_id)].slug,
+            },
+            "director": {
+                "id": directors[int(director_id)].id,
+                "name": directors[int(director_id)].name,
+                "photo_url": directors[int(director_id)].photo_url,
+                "slug": directors[int(director_id)].slug,
+            },
+            "collaborations": int(counts[position]),
+        }
+        for actor_id, director_id, position in zip(actor_ids, director_ids, ranked)
+    ]
+
+
+# section name -> function computing it live
+STATS_SECTIONS = {
+    "movie_stats": fetch_movie_stats,
+    "actor_stats": fetch_actor_stats,
+    "director_stats": fetch_director_stats,
+    "genre_stats": fetch_genre_stats,
+    "collaborations": fetch_popular_pairings,
+}
+
+# the same sections answered by the optional columnar engine
+COLUMNAR_STATS_SECTIONS = {
+    "movie_stats": fetch_movie_stats_columnar,
+    "actor_stats": fetch_actor_stats_columnar,
+    "director_stats": fetch_director_stats_columnar,
+    "genre_stats": fetch_genre_stats_columnar,
+    "collaborations": fetch_popular_pairings_columnar,
+}
+
+# section name -> tables whose new rows can change the section. Ingest only
+# ever inserts, so e.g. a new movie without links cannot move the actor stats.
+STATS_SECTION_TABLES = {
+    "movie_stats": {"movies"},
+    "actor_stats": {"actors", "movie_actors"},
+    "director_stats": {"directors", "movie_directors"},
+    "genre_stats": {"genres", "movie_genres"},
+    "collaborations": {
+        "movie_actors",
+        "movie_directors",
+        "actor_director_collaborations",
+    },
+}
+
+
+def columnar_engine_selected() -> bool:
+    """
+    Check whether /stats is answered by the columnar engine: configured as the
+    stats engine and its NumPy dependency installed.
+
+    Returns:
+        bool: True if the columnar engine computes the stats sections.
+    """
+    return app.config["STATS_ENGINE"] == "columnar" and columnar_engine_available()
+
+
+def fetch_stats_section(section: str, version: int):
+    """
+    Compute a single stats section, swallowing errors like the section fetchers do.
+
+    Args:
+        section (str): The name of the section to compute.
+        version (int): The current data version.
+
+    Returns:
+        The section data, or None if it could not be computed.
+    """
+    try:
+        if columnar_engine_selected():
+            return COLUMNAR_STATS_SECTIONS[section](get_catalog(version))
+        return STATS_SECTIONS[section]()
+    except Exception as e:
+        print(f"Error fetching {section}: {e}", file=sys.stderr)
+        return None
+
+
+def fetch_stats_section_in_context(section: str, version: int):
+    """
+    Compute a stats section on a worker thread with its own app context and session.
+
+    Args:
+        section (str): The name of the section to compute.
+        version (int): The current data version.
+
+    Returns:
+        The section data, or None if it could not be computed.
+    """
+    # the session is removed, and its connection returned to the pool, when
+    # the app context is torn down
+    with app.app_context():
+        return fetch_stats_section(section, version)
+
+
+def fetch_stats_sections(sections, version: int) -> tuple:
+    """
+    Compute the requested stats sections using the configured execution mode.
+
+    In parallel mode every section runs on the bounded stats pool and all of them
+    share one deadline of STATS_SECTION_TIMEOUT seconds. Sections that miss it are
+    reported back instead of failing the whole request.
+
+    Args:
+        sections (iterable): The names of the sections to compute.
+        version (int): The current data version, read once for all the sections.
+
+    Returns:
+        tuple: A dictionary of computed sections and a list of timed out sections.
+    """
+    if app.config["STATS_EXECUTION_MODE"] != "parallel":
+        return {
+            section: fetch_stats_section(section, version) for section in sections
+        }, []
+
+    futures = {
+        section: stats_executor.submit(fetch_stats_section_in_context, section, version)
+        for section in sections
+    }
+    deadline = time.monotonic() + app.config["STATS_SECTION_TIMEOUT"]
+
+    results = dict()
+    timed_out = []
+    for section, future in futures.items():
+        try:
+            results[section] = future.result(
+                timeout=max(deadline - time.monotonic(), 0)
+            )
+        except FutureTimeoutError:
+            # a section still waiting for a worker will never start
+            future.cancel()
+            timed_out.append(section)
+
+    return results, timed_out
+
+
+def refresh_stats_snapshot(tables=None) -> list:
+    """
+    Recompute the persisted stats snapshot for the sections affected by a change.
+
+    Args:
+        tables (iterable, optional): Names of the tables that received new rows.
+            Rebuilds every section when None.
+
+    Returns:
+        list: The names of the sections that were rebuilt.
+    """
+    changed = set(tables) if tables is not None else None
+    sections = [
+        section
+        for section, dependencies in STATS_SECTION_TABLES.items()
+        if changed is None or dependencies & changed
+    ]
+
+    results, _ = fetch_stats_sections(sections, get_data_version())
+
+    rebuilt = []
+    for section in sections:
+        data = results.get(section)
+
+        # keep the previous snapshot rather than persisting a failed section
+        if data is None:
+            db.session.rollback()
+            continue
+
+        snapshot = db.session.get(StatsSnapshot, section)
+        if snapshot is None:
+            db.session.add(StatsSnapshot(section, data))
+        else:
+            snapshot.data = data
+            snapshot.version += 1
+        db.session.commit()
+        rebuilt.append(section)
+
+    return rebuilt
+
+
+def read_stats_snapshot(sections=None) -> dict:
+    """
+    Read persisted stats sections in a single query.
+
+    Args:
+        sections (iterable, optional): The sections to read. Reads all when None.
+
+    Returns:
+        dict: A dictionary with section names as keys and their snapshot data as values.
+    """
+    query = db.session.query(StatsSnapshot.section, StatsSnapshot.data)
+    if sections is not None:
+        query = query.filter(StatsSnapshot.section.in_(list(sections)))
+
+    try:
+        return dict(query.all())
+    except Exception as e:
+        print(f"Error reading stats snapshot: {e}", file=sys.stderr)
+        db.session.rollback()
+        return dict()
+
+
+def fetch_stats(sections) -> tuple:
+    """
+    Fetch stats sections lazily: from the section cache first, then the persisted
+    snapshot, and only compute live what neither of them holds. The columnar
+    engine skips the snapshot and computes every uncached section live.
+
+    Args:
+        sections (list): The names of the sections to fetch.
+
+    Returns:
+        tuple: A dictionary of fetched sections, a list of timed out sections and a
+            list of sections that could not be computed.
+    """
+    version = get_data_version()
+
     stats = dict()
+    for section in sections:
+        data = stats_cache.get(section, version)
+        if data is not None:
+            stats[section] = data
+
+    pending = [section for section in sections if section not in stats]
+    if not pending:
+        return stats, [], []
+
+    # the columnar engine answers from its in-memory catalog, the snapshot only
+    # stands in for the slower SQL engine
+    snapshot = dict() if columnar_engine_selected() else read_stats_snapshot(pending)
+    live, timed_out = fetch_stats_sections(
+        [section for section in pending if section not in snapshot], version
+    )
+
+    failed = []
+    for section in pending:
+        data = snapshot[section] if section in snapshot else live.get(section)
+        if data is not None:
+            stats_cache.set(section, data, version)
+            stats[section] = data
+        elif section not in timed_out:
+            failed.append(section)
+
+    return stats, timed_out, failed
+
 
-    movie_stats = fetch_movie_stats()
-    actor_stats = fetch_actor_stats()
-    director_stats = fetch_director_stats()
-    genre_stats = fetch_genre_stats()
-    collaborations = fetch_popular_pairings()
-
-    if movie_stats:
-        stats["movie_stats"] = movie_stats
-    if actor_stats:
-        stats["actor_stats"] = actor_stats
-    if director_stats:
-        stats["director_stats"] = director_stats
-    if genre_stats:
-        stats["genre_stats"] = genre_stats
-    if collaborations:
-        stats["collaborations"] = collaborations
+def parse_sections_parameter(request_args):
+    """
+    Parse the stats sections requested through the `sections` parameter.
+
+    Args:
+        request_args (dict): The request arguments containing the sections parameter.
+
+    Returns:
+        list or None: The requested section names, every section if the parameter is
+            missing, or None if an unknown section was requested.
+    """
+    sections = request_args.get("sections")
+    if not sections:
+        return list(STATS_SECTIONS)
+
+    requested = [section.strip() for section in sections.split(",") if section.strip()]
+    if any(section not in STATS_SECTIONS for section in requested):
+        return None
+
+    return requested
+
+
+def format_stats_result(stats: dict, timed_out: list, failed: list) -> dict:
+    """
+    Wrap fetched stats sections in the response envelope.
+
+    Args:
+        stats (dict): The fetched sections.
+        timed_out (list): The sections that missed the parallel execution deadline.
+        failed (list): The sections that could not be computed.
+
+    Returns:
+        dict: A dictionary containing the status and statistics data.
+    """
+    # drop empty sections
+    stats = {section: data for section, data in stats.items() if data}
 
     # if not stats were fetched return an error message
     if not stats:
@@ -562,7 +1349,115 @@ def get_stats():
             "message": "Failed to fetch statistics",
         }
 
-    return {
+    result = {
         **Status.SUCCESS.value,
         "data": stats,
     }
+
+    # partial stats, let the client know what is missing
+    if timed_out:
+        result["timed_out"] = timed_out
+    if failed:
+        result["failed"] = failed
+
+    return result
+
+
+@stats.route("/stats", methods=["GET"])
+@conditional_response(data_version_validators, weak=True)
+def get_stats():
+    """Get statistics about movies, actors, genres, and directors in the database.
+
+    A comma separated `sections` parameter restricts the response to those sections,
+    only they are fetched.
+
+    Returns:
+        dict: A dictionary containing the status and statistics data.
+    """
+    sections = parse_sections_parameter(request.args)
+    if sections is None:
+        return {**Status.FAIL.value, "message": "invalid sections"}
+
+    return format_stats_result(*fetch_stats(sections))
+
+
+@stats.route("/stats/<string:section>", methods=["GET"])
+@conditional_response(data_version_validators, weak=True)
+def get_stats_section(section: str):
+    """Get a single section of the statistics.
+
+    Args:
+        section (str): The name of the section, e.g. movie_stats.
+
+    Returns:
+        dict: A dictionary containing the status and the section data.
+    """
+    if section not in STATS_SECTIONS:
+        return {**Status.NOT_FOUND.value, "message": "not found"}
+
+    return format_stats_result(*fetch_stats([section]))
+
+
+@stats.route("/stats/<string:section>/<string:key>", methods=["GET"])
+@conditional_response(data_version_validators, weak=True)
+def get_stats_section_key(section: str, key: str):
+    """Get a single entry of a statistics section, e.g. genre_stats/popularity_over_time.
+
+    Args:
+        section (str): The name of the section.
+        key (str): The name of the entry within the section.
+
+    Returns:
+        dict: A dictionary containing the status and the entry data.
+    """
+    if section not in STATS_SECTIONS:
+        return {**Status.NOT_FOUND.value, "message": "not found"}
+
+    stats, timed_out, failed = fetch_stats([section])
+    data = stats.get(section)
+    if data is None:
+        return format_stats_result(stats, timed_out, failed)
+
+    if not isinstance(data, dict) or key not in data:
+        return {**Status.NOT_FOUND.value, "message": "not found"}
+
+    return format_stats_result({section: {key: data[key]}}, timed_out, failed)
+
+
+@stats.route("/stats/actors/career-spans", methods=["GET"])
+@conditional_response(data_version_validators, weak=True)
+def get_actor_career_spans():
+    """Get actors appearing in more than one movie, longest career span first.
+
+    Paginated through the `limit` (at most 100) and `page` parameters.
+
+    Returns:
+        dict: A dictionary containing the status and the career spans.
+    """
+    try:
+        limit = int(request.args.get("limit", 10))
+        page = int(request.args.get("page", 1))
+    except ValueError:
+        return {**Status.FAIL.value, "message": "invalid pagination"}
+
+    if not 1 <= limit <= 100 or page < 1:
+        return {**Status.FAIL.value, "message": "invalid pagination"}
+
+    try:
+        career_spans = fetch_actor_career_spans(limit, (page - 1) * limit)
+        total = actor_career_spans_query().order_by(None).count()
+    except Exception as e:
+        print(f"Error fetching career spans: {e}", file=sys.stderr)
+        return {**Status.ERROR.value, "message": "data fetch failed"}
+
+    return {
+        **Status.SUCCESS.value,
+        "data": {
+            "career_spans": [
+                format_longest_career_actor(actor) for actor in career_spans
+            ],
+            "total": total,
+            "page": page,
+            "limit": limit,
+        },
+    }
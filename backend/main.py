@@ -1,15 +1,29 @@
 import os
 from app_init import app
+from compression import compress_response
+from utils import forget_data_stamps
 from endpoints.stats import stats
 from endpoints.movies import movies
 from endpoints.actors import actors
 from endpoints.directors import directors
+from endpoints.genres import genres
+from endpoints.autocomplete import autocomplete
+from endpoints.caches import caches
 
 # Register all blueprints
 app.register_blueprint(stats, url_prefix="/api/v1")
 app.register_blueprint(movies, url_prefix="/api/v1")
 app.register_blueprint(actors, url_prefix="/api/v1")
 app.register_blueprint(directors, url_prefix="/api/v1")
+app.register_blueprint(genres, url_prefix="/api/v1")
+app.register_blueprint(autocomplete, url_prefix="/api/v1")
+app.register_blueprint(caches, url_prefix="/api/v1")
+
+# compress large responses for clients accepting it
+app.after_request(compress_response)
+
+# data versions are read once per request
+app.teardown_request(forget_data_stamps)
 
 
 @app.route("/")
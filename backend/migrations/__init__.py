@@ -0,0 +1,47 @@
+import importlib
+from app_init import db
+
+# names of the migrations already applied to the database
+schema_migrations = db.Table(
+    "schema_migrations",
+    db.Column("name", db.String(255), primary_key=True),
+    db.Column("applied_at", db.DateTime, server_default=db.func.now()),
+)
+
+# every migration, in order of application. Each module defines an idempotent
+# upgrade(connection) function
+MIGRATIONS = [
+    "m0001_search_indexes",
+    "m0002_reverse_association_indexes",
+    "m0003_filter_sort_indexes",
+    "m0004_backfill_collaborations",
+]
+
+
+def run_migrations(verbose: bool = False) -> list:
+    """
+    Applies the migrations that were not applied to the database yet.
+    Must run inside an app context, after the tables were created.
+    Args:
+        verbose (bool): If True, prints every migration as it is applied.
+    Returns:
+        list: The names of the migrations that were applied.
+    """
+    schema_migrations.create(bind=db.session.connection(), checkfirst=True)
+    applied = {name for (name,) in db.session.query(schema_migrations.c.name).all()}
+
+    ran = []
+    for name in MIGRATIONS:
+        if name in applied:
+            continue
+
+        module = importlib.import_module(f"migrations.{name}")
+        module.upgrade(db.session.connection())
+        db.session.execute(schema_migrations.insert().values(name=name))
+        db.session.commit()
+        ran.append(name)
+
+        if verbose:
+            print(f"Applied migration {name}.")
+
+    return ran
@@ -0,0 +1,63 @@
+"""
+Search indexes for the ?search= parameter of the list endpoints.
+
+PostgreSQL gets trigram GIN indexes, which serve the ILIKE '%term%' filters and the
+word_similarity() ranking. SQLite gets external content FTS5 tables using the trigram
+tokenizer (SQLite 3.34+), kept in sync with their source tables by triggers.
+"""
+
+from sqlalchemy import text
+
+# table -> searched columns
+SEARCH_COLUMNS = {
+    "movies": ["title"],
+    "actors": ["name"],
+    "directors": ["name"],
+}
+
+
+def upgrade_postgresql(connection) -> None:
+    connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+    for table, columns in SEARCH_COLUMNS.items():
+        for column in columns:
+            connection.execute(
+                text(
+                    f"CREATE INDEX IF NOT EXISTS ix_{table}_{column}_trgm "
+                    f"ON {table} USING gin ({column} gin_trgm_ops)"
+                )
+            )
+
+
+def upgrade_sqlite(connection) -> None:
+    for table, columns in SEARCH_COLUMNS.items():
+        fts = f"{table}_fts"
+        names = ", ".join(columns)
+        new_values = ", ".join(f"new.{column}" for column in columns)
+        old_values = ", ".join(f"old.{column}" for column in columns)
+
+        statements = [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({names}, "
+            f"content='{table}', content_rowid='id', tokenize='trigram')",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {names}) "
+            f"VALUES ('delete', old.id, {old_values}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {names}) "
+            f"VALUES ('delete', old.id, {old_values}); "
+            f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+            # index the rows that already exist
+            f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+        ]
+        for statement in statements:
+            connection.execute(text(statement))
+
+
+def upgrade(connection) -> None:
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        upgrade_postgresql(connection)
+    elif dialect == "sqlite":
+        upgrade_sqlite(connection)
@@ -0,0 +1,24 @@
+"""
+Composite (entity, movie) indexes on the association tables, serving the reverse
+/actors/<id>/movies, /directors/<id>/movies and /genres/<id>/movies lookups with
+index-only scans. Databases created after this migration get them from the models.
+"""
+
+from sqlalchemy import text
+
+# association table -> column of the entity the movies are looked up by
+REVERSE_COLUMNS = {
+    "movie_actors": "actor_id",
+    "movie_directors": "director_id",
+    "movie_genres": "genre_id",
+}
+
+
+def upgrade(connection) -> None:
+    for table, column in REVERSE_COLUMNS.items():
+        connection.execute(
+            text(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_{column} "
+                f"ON {table} ({column}, movie_id)"
+            )
+        )
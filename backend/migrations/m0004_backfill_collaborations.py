@@ -0,0 +1,21 @@
+"""
+Fills the actor_director_collaborations table of databases created before it was
+maintained by populate_db.py, which only counts the collaborations of new links.
+Databases created after this migration are filled as their links are added.
+"""
+
+from sqlalchemy import text
+
+
+def upgrade(connection) -> None:
+    connection.execute(text("DELETE FROM actor_director_collaborations"))
+    connection.execute(
+        text(
+            "INSERT INTO actor_director_collaborations "
+            "(actor_id, director_id, collaborations) "
+            "SELECT movie_actors.actor_id, movie_directors.director_id, count(*) "
+            "FROM movie_actors JOIN movie_directors "
+            "ON movie_actors.movie_id = movie_directors.movie_id "
+            "GROUP BY movie_actors.actor_id, movie_directors.director_id"
+        )
+    )
@@ -2,4 +2,11 @@ from .movies import Movie
 from .actors import Actor
 from .directors import Director
 from .genres import Genre
-from .associations import movie_genres, movie_actors, movie_directors
+from .associations import (
+    movie_genres,
+    movie_actors,
+    movie_directors,
+    actor_director_collaborations,
+)
+from .stats_snapshot import StatsSnapshot
+from .data_version import DataVersion
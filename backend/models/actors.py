@@ -4,7 +4,11 @@ from app_init import db
 # Actors model
 class Actor(db.Model):
     __tablename__ = "actors"
-    __table_args__ = (db.UniqueConstraint("slug", name="uq_actors_slug"),)
+    __table_args__ = (
+        db.UniqueConstraint("slug", name="uq_actors_slug"),
+        # sort by name of /actors
+        db.Index("ix_actors_name", "name", "id"),
+    )
 
     # primary key
     id = db.Column(db.Integer, primary_key=True)
@@ -8,6 +8,8 @@ movie_genres = db.Table(
     db.Column(
         "updated_at", db.DateTime, server_default=db.func.now(), onupdate=db.func.now()
     ),
+    # reverse lookups: the movies of a genre
+    db.Index("ix_movie_genres_genre_id", "genre_id", "movie_id"),
 )
 
 movie_actors = db.Table(
@@ -18,6 +20,8 @@ movie_actors = db.Table(
     db.Column(
         "updated_at", db.DateTime, server_default=db.func.now(), onupdate=db.func.now()
     ),
+    # reverse lookups: the movies of an actor
+    db.Index("ix_movie_actors_actor_id", "actor_id", "movie_id"),
 )
 
 movie_directors = db.Table(
@@ -30,4 +34,24 @@ movie_directors = db.Table(
     db.Column(
         "updated_at", db.DateTime, server_default=db.func.now(), onupdate=db.func.now()
     ),
+    # reverse lookups: the movies of a director
+    db.Index("ix_movie_directors_director_id", "director_id", "movie_id"),
+)
+
+# derived from movie_actors x movie_directors, maintained by populate_db.py
+actor_director_collaborations = db.Table(
+    "actor_director_collaborations",
+    db.Column("actor_id", db.Integer, db.ForeignKey("actors.id"), primary_key=True),
+    db.Column(
+        "director_id", db.Integer, db.ForeignKey("directors.id"), primary_key=True
+    ),
+    db.Column("collaborations", db.Integer, nullable=False, default=0),
+    db.Column("created_at", db.DateTime, server_default=db.func.now()),
+    db.Column(
+        "updated_at", db.DateTime, server_default=db.func.now(), onupdate=db.func.now()
+    ),
+    db.Index("ix_actor_director_collaborations_collaborations", "collaborations"),
+    db.Index(
+        "ix_actor_director_collaborations_director_id", "director_id", "collaborations"
+    ),
 )
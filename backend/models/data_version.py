@@ -0,0 +1,26 @@
+from app_init import db
+
+
+# Data version model
+class DataVersion(db.Model):
+    __tablename__ = "data_versions"
+
+    # primary key (name of the versioned data set)
+    name = db.Column(db.String(64), primary_key=True)
+
+    # bumped by populate_db.py every time the data set changes
+    version = db.Column(db.Integer, nullable=False, default=1)
+
+    # timestamps
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    updated_at = db.Column(
+        db.DateTime, server_default=db.func.now(), onupdate=db.func.now()
+    )
+
+    def __init__(self, name: str, version: int = 1) -> None:
+        # populate fields
+        self.name = name
+        self.version = version
+
+    def __repr__(self) -> str:
+        return f"<DataVersion {self.name} v{self.version}>"
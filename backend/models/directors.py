@@ -4,7 +4,11 @@ from app_init import db
 # Directors model
 class Director(db.Model):
     __tablename__ = "directors"
-    __table_args__ = (db.UniqueConstraint("slug", name="uq_directors_slug"),)
+    __table_args__ = (
+        db.UniqueConstraint("slug", name="uq_directors_slug"),
+        # sort by name of /directors
+        db.Index("ix_directors_name", "name", "id"),
+    )
 
     # primary key
     id = db.Column(db.Integer, primary_key=True)
@@ -5,7 +5,17 @@ from models.associations import movie_genres, movie_actors, movie_directors
 # Movies model
 class Movie(db.Model):
     __tablename__ = "movies"
-    __table_args__ = (db.UniqueConstraint("slug", name="uq_movies_slug"),)
+    __table_args__ = (
+        db.UniqueConstraint("slug", name="uq_movies_slug"),
+        # filters and sorts of /movies, the id tiebreaker keeps them index-ordered
+        db.Index("ix_movies_title", "title", "id"),
+        db.Index("ix_movies_release_year", "release_year", "id"),
+        db.Index("ix_movies_duration", "duration", "id"),
+        db.Index("ix_movies_rating", "rating", "id"),
+        db.Index("ix_movies_mpaa_rating", "mpaa_rating", "id"),
+        # covers the average rating by year of /stats
+        db.Index("ix_movies_release_year_rating", "release_year", "rating"),
+    )
 
     # primary key
     id = db.Column(db.Integer, primary_key=True)
@@ -0,0 +1,28 @@
+from app_init import db
+
+
+# Stats snapshot model
+class StatsSnapshot(db.Model):
+    __tablename__ = "stats_snapshots"
+
+    # primary key (one row per /stats section)
+    section = db.Column(db.String(64), primary_key=True)
+
+    # bumped every time the section is rebuilt
+    version = db.Column(db.Integer, nullable=False, default=1)
+    data = db.Column(db.JSON)
+
+    # timestamps
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    updated_at = db.Column(
+        db.DateTime, server_default=db.func.now(), onupdate=db.func.now()
+    )
+
+    def __init__(self, section: str, data, version: int = 1) -> None:
+        # populate fields
+        self.section = section
+        self.data = data
+        self.version = version
+
+    def __repr__(self) -> str:
+        return f"<StatsSnapshot {self.section} v{self.version}>"
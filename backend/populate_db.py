@@ -1,7 +1,14 @@
+import sys
 import json
 import argparse
 from app_init import db, app
 from sqlalchemy import MetaData
+from collections import Counter, defaultdict
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from utils import bump_data_version
+from migrations import run_migrations
+from endpoints.stats import refresh_stats_snapshot
 from models import (
     Movie,
     Actor,
@@ -10,8 +17,13 @@ from models import (
     movie_actors,
     movie_directors,
     movie_genres,
+    actor_director_collaborations,
 )
 
+# movie ids per query when reading the links of new links' movies, below the bound
+# parameter limit of older SQLite versions
+MOVIE_ID_CHUNK_SIZE = 500
+
 
 def drop_all_tables():
     """
@@ -23,9 +35,21 @@ def drop_all_tables():
         metadata.drop_all(bind=db.engine)  # Drop all tables
 
 
+def record_changes(tables: list):
+    """
+    Brings derived data up to date after new rows were added to some tables.
+    Args:
+        tables (list): Names of the tables that received new rows.
+    """
+    refresh_stats_snapshot(tables=tables)
+
+    # bump last so nothing gets cached against the new version from stale data
+    bump_data_version()
+
+
 def create_tables(drop_all: bool = False):
     """
-    Creates all tables in the database.
+    Creates all tables in the database and applies the pending migrations.
     Args:
         drop_all (bool): If True, drops all tables before creating them.
     """
@@ -33,6 +57,11 @@ def create_tables(drop_all: bool = False):
         if drop_all:
             drop_all_tables()
         db.create_all()
+        applied = run_migrations(verbose=True)
+
+        # the backfilled collaborations feed a stats section and cached responses
+        if "m0004_backfill_collaborations" in applied:
+            record_changes([actor_director_collaborations.name])
 
 
 def add_movies(verbose: bool = False):
@@ -65,6 +94,9 @@ def add_movies(verbose: bool = False):
 
         print(f"{new_count} movies added to the database.")
 
+        if new_count:
+            record_changes(["movies"])
+
 
 def add_actors(verbose: bool = False):
     """
@@ -96,6 +128,9 @@ def add_actors(verbose: bool = False):
 
         print(f"{new_count} actors added to the database.")
 
+        if new_count:
+            record_changes(["actors"])
+
 
 def add_directors(verbose: bool = False):
     """
@@ -127,6 +162,9 @@ def add_directors(verbose: bool = False):
 
         print(f"{new_count} directors added to the database.")
 
+        if new_count:
+            record_changes(["directors"])
+
 
 def add_genres(verbose: bool = False):
     """
@@ -158,6 +196,104 @@ def add_genres(verbose: bool = False):
 
         print(f"{new_count} genres added to the database.")
 
+        if new_count:
+            record_changes(["genres"])
+
+
+def upsert_collaborations(pair_counts: Counter):
+    """
+    Adds collaboration counts to the actor_director_collaborations table.
+    Args:
+        pair_counts (Counter): Counts to add, keyed by (actor_id, director_id).
+    """
+    if not pair_counts:
+        return
+
+    if db.engine.dialect.name == "postgresql":
+        statement = postgresql_insert(actor_director_collaborations)
+    else:
+        statement = sqlite_insert(actor_director_collaborations)
+
+    statement = statement.on_conflict_do_update(
+        index_elements=["actor_id", "director_id"],
+        set_={
+            "collaborations": actor_director_collaborations.c.collaborations
+            + statement.excluded.collaborations,
+        },
+    )
+    db.session.execute(
+        statement,
+        [
+            {"actor_id": actor_id, "director_id": director_id, "collaborations": count}
+            for (actor_id, director_id), count in pair_counts.items()
+        ],
+    )
+
+
+def record_collaborations(association_table, new_links: list):
+    """
+    Counts the actor-director collaborations created by new movie_actors or
+    movie_directors links. Links are inserted one table at a time, so pairing them
+    with the other table's links counts every collaboration exactly once.
+    Args:
+        association_table: movie_actors or movie_directors.
+        new_links (list): The inserted links, as dictionaries of column values.
+    """
+    if association_table is movie_actors:
+        other_table, own_column, other_column = (
+            movie_directors,
+            "actor_id",
+            "director_id",
+        )
+    else:
+        other_table, own_column, other_column = (
+            movie_actors,
+            "director_id",
+            "actor_id",
+        )
+
+    # other side of every movie that got new links
+    movie_ids = sorted({link["movie_id"] for link in new_links})
+    others = defaultdict(list)
+    for start in range(0, len(movie_ids), MOVIE_ID_CHUNK_SIZE):
+        chunk = movie_ids[start : start + MOVIE_ID_CHUNK_SIZE]
+        for movie_id, other_id in db.session.query(
+            other_table.c.movie_id, other_table.c[other_column]
+        ).filter(other_table.c.movie_id.in_(chunk)):
+            others[movie_id].append(other_id)
+
+    pair_counts = Counter()
+    for link in new_links:
+        for other_id in others[link["movie_id"]]:
+            pair = {own_column: link[own_column], other_column: other_id}
+            pair_counts[(pair["actor_id"], pair["director_id"])] += 1
+
+    upsert_collaborations(pair_counts)
+
+
+def rebuild_collaborations():
+    """
+    Recomputes the actor_director_collaborations table from the association tables.
+    """
+    db.session.execute(actor_director_collaborations.delete())
+    db.session.execute(
+        actor_director_collaborations.insert().from_select(
+            ["actor_id", "director_id", "collaborations"],
+            db.select(
+                movie_actors.c.actor_id,
+                movie_directors.c.director_id,
+                db.func.count(),
+            )
+            .join_from(
+                movie_actors,
+                movie_directors,
+                movie_actors.c.movie_id == movie_directors.c.movie_id,
+            )
+            .group_by(movie_actors.c.actor_id, movie_directors.c.director_id),
+        )
+    )
+    db.session.commit()
+
 
 def add_association(
     json_path: str,
@@ -245,6 +381,8 @@ def add_association(
                 association_table.insert(),
                 new_links,
             )
+            if association_table in (movie_actors, movie_directors):
+                record_collaborations(association_table, new_links)
             db.session.commit()
 
         file.close()
@@ -254,6 +392,21 @@ def add_association(
         if verbose:
             print(f"{skipped} associations skipped due to duplicates.")
 
+        if new_links:
+            record_changes([association_table.name])
+
+
+def rebuild_stats():
+    """
+    Rebuilds the collaborations table and every section of the stats snapshot from
+    the current data.
+    """
+    with app.app_context():
+        rebuild_collaborations()
+        rebuilt = refresh_stats_snapshot()
+        bump_data_version()
+        print(f"{len(rebuilt)} stats sections rebuilt: {', '.join(rebuilt)}.")
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
@@ -274,9 +427,28 @@ if __name__ == "__main__":
         action="store_true",
         help="Include genres when populating the database.",
     )
+    parser.add_argument(
+        "--rebuild-stats",
+        action="store_true",
+        help="Rebuild the collaborations and stats snapshot from scratch and exit.",
+    )
+    parser.add_argument(
+        "--migrate",
+        action="store_true",
+        help="Create missing tables, apply pending migrations and exit.",
+    )
 
     args = parser.parse_args()
 
+    if args.migrate:
+        create_tables()
+        sys.exit(0)
+
+    if args.rebuild_stats:
+        create_tables()
+        rebuild_stats()
+        sys.exit(0)
+
     create_tables(drop_all=args.drop_all)
 
     add_movies(verbose=args.verbose)
@@ -0,0 +1,112 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# the app reads its configuration when imported: point it at a throwaway SQLite
+# database and in-process caches before anything imports app_init
+TEST_DIR = tempfile.mkdtemp(prefix="riks-flix-tests-")
+os.environ["DB_URI"] = f"sqlite:///{os.path.join(TEST_DIR, 'test.db')}"
+os.environ["CACHE_BACKEND"] = "memory"
+os.environ["CACHE_PATH"] = os.path.join(TEST_DIR, "cache.sqlite3")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402, registers the blueprints
+from app_init import app, db  # noqa: E402
+from endpoints.stats import stats_cache  # noqa: E402
+from utils import bump_data_version, response_cache, count_cache  # noqa: E402
+from utils import validator_cache  # noqa: E402
+from models import (  # noqa: E402
+    Movie,
+    Actor,
+    Director,
+    Genre,
+    movie_actors,
+    movie_directors,
+    movie_genres,
+)
+
+# size of the seeded catalog
+MOVIE_COUNT = 30
+ACTOR_COUNT = 12
+DIRECTOR_COUNT = 6
+GENRE_COUNT = 4
+
+
+def seed_catalog() -> None:
+    """
+    Fill the database with a small deterministic catalog: movie i (1-based ids)
+    features the actors i % 12 + 1, (i + 1) % 12 + 1 and (i + 5) % 12 + 1, the
+    director i % 6 + 1 and the genre i % 4 + 1.
+    """
+    db.drop_all()
+    db.create_all()
+
+    for i in range(MOVIE_COUNT):
+        db.session.add(
+            Movie(
+                f"Movie {i}",
+                1980 + i,
+                90 + i,
+                "tagline",
+                "description",
+                round(5 + (i % 10) / 2, 1),
+                ["G", "PG", "R"][i % 3],
+                "poster",
+                "image",
+                "trailer",
+                f"movie-{i}",
+            )
+        )
+    for i in range(ACTOR_COUNT):
+        db.session.add(Actor(f"Actor {i}", "biography", "photo", "imdb", f"actor-{i}"))
+    for i in range(DIRECTOR_COUNT):
+        db.session.add(
+            Director(f"Director {i}", "biography", "photo", "imdb", f"director-{i}")
+        )
+    for i in range(GENRE_COUNT):
+        db.session.add(Genre(f"Genre {i}", f"genre-{i}"))
+    db.session.commit()
+
+    for movie_id in range(1, MOVIE_COUNT + 1):
+        actor_ids = {(movie_id + offset) % ACTOR_COUNT + 1 for offset in (0, 1, 5)}
+        db.session.execute(
+            movie_actors.insert(),
+            [{"movie_id": movie_id, "actor_id": actor_id} for actor_id in actor_ids],
+        )
+        db.session.execute(
+            movie_directors.insert(),
+            {"movie_id": movie_id, "director_id": movie_id % DIRECTOR_COUNT + 1},
+        )
+        db.session.execute(
+            movie_genres.insert(),
+            {"movie_id": movie_id, "genre_id": movie_id % GENRE_COUNT + 1},
+        )
+    db.session.commit()
+
+    bump_data_version()
+
+
+@pytest.fixture
+def catalog():
+    """
+    A freshly seeded database and empty caches, inside an app context.
+    """
+    with app.app_context():
+        seed_catalog()
+        for cache in (response_cache, count_cache, validator_cache, stats_cache):
+            cache.clear()
+
+        yield db
+
+        db.session.remove()
+
+
+@pytest.fixture
+def client(catalog):
+    """
+    A test client of the app over the seeded catalog.
+    """
+    return app.test_client()
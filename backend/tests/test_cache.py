@@ -0,0 +1,126 @@
+import types
+
+import pytest
+
+import cache
+from cache import SQLiteCache, TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    A settable clock replacing both clocks of the cache module.
+    """
+    now = types.SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(
+        cache,
+        "time",
+        types.SimpleNamespace(time=lambda: now.value, monotonic=lambda: now.value),
+    )
+    return now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path, clock):
+    """
+    Build caches of either backend, the SQLite ones sharing one file.
+    """
+
+    def make(ttl=60, max_entries=None, namespace="test"):
+        if request.param == "memory":
+            return TTLCache(ttl, max_entries)
+        return SQLiteCache(str(tmp_path / "cache.sqlite3"), namespace, ttl, max_entries)
+
+    return make
+
+
+def test_get_returns_value_of_current_version(make_cache):
+    store = make_cache()
+    store.set("key", {"movies": [1, 2]}, version=1)
+
+    assert store.get("key", 1) == {"movies": [1, 2]}
+    assert store.get("missing", 1) is None
+    assert store.info()["hits"] == 1
+    assert store.info()["misses"] == 1
+
+
+def test_entry_of_another_version_is_a_miss(make_cache):
+    store = make_cache()
+    store.set("key", "value", version=1)
+
+    assert store.get("key", 2) is None
+
+
+def test_entry_expires_after_ttl(make_cache, clock):
+    store = make_cache(ttl=10)
+    store.set("key", "value", version=1)
+
+    clock.value += 9
+    assert store.get("key", 1) == "value"
+
+    clock.value += 1
+    assert store.get("key", 1) is None
+
+
+def test_least_recently_used_entry_is_evicted(make_cache, clock):
+    store = make_cache(max_entries=2)
+    store.set("first", 1, version=1)
+    clock.value += 1
+    store.set("second", 2, version=1)
+    clock.value += 1
+
+    # reading the oldest entry makes the second one the least recently used
+    assert store.get("first", 1) == 1
+    clock.value += 1
+    store.set("third", 3, version=1)
+
+    assert store.get("second", 1) is None
+    assert store.get("first", 1) == 1
+    assert store.get("third", 1) == 3
+    assert store.info()["entries"] == 2
+    assert store.info()["evictions"] == 1
+
+
+def test_clear_drops_every_entry(make_cache):
+    store = make_cache()
+    store.set("key", "value", version=1)
+    store.clear()
+
+    assert store.get("key", 1) is None
+    assert store.info()["entries"] == 0
+
+
+def test_sqlite_namespaces_are_independent(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite3")
+    responses = SQLiteCache(path, "responses", 60, max_entries=1)
+    counts = SQLiteCache(path, "counts", 60, max_entries=1)
+
+    responses.set("key", "response", version=1)
+    counts.set("key", 30, version=1)
+    counts.set("other", 40, version=2)
+
+    assert responses.get("key", 1) == "response"
+    assert counts.get("key", 1) is None
+    assert counts.get("other", 2) == 40
+
+
+def test_sqlite_write_purges_older_versions(tmp_path, clock):
+    store = SQLiteCache(str(tmp_path / "cache.sqlite3"), "test", 60)
+    store.set("old", "value", version=1)
+    store.set("new", "value", version=2)
+
+    assert store.info()["entries"] == 1
+
+
+def test_sqlite_round_trips_bytes(tmp_path, clock):
+    store = SQLiteCache(str(tmp_path / "cache.sqlite3"), "test", 60)
+    store.set("key", {"gzip": b"\x1f\x8b\x00", "etag": '"abc"'}, version=1)
+
+    assert store.get("key", 1) == {"gzip": b"\x1f\x8b\x00", "etag": '"abc"'}
+
+
+def test_sqlite_cache_is_shared_across_instances(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite3")
+    SQLiteCache(path, "test", 60).set("key", "value", version=1)
+
+    assert SQLiteCache(path, "test", 60).get("key", 1) == "value"
@@ -0,0 +1,154 @@
+import json
+from collections import Counter, defaultdict
+
+import pytest
+
+import populate_db
+from conftest import db, Movie, Actor, Director, movie_actors, movie_directors
+from migrations import m0004_backfill_collaborations
+from models import actor_director_collaborations
+
+
+def stored_collaborations() -> dict:
+    """
+    The rows of the actor_director_collaborations table.
+    """
+    return {
+        (actor_id, director_id): count
+        for actor_id, director_id, count in db.session.query(
+            actor_director_collaborations.c.actor_id,
+            actor_director_collaborations.c.director_id,
+            actor_director_collaborations.c.collaborations,
+        )
+    }
+
+
+def expected_collaborations() -> dict:
+    """
+    The collaborations of the current links, counted in Python.
+    """
+    directors = defaultdict(list)
+    for movie_id, director_id in db.session.query(
+        movie_directors.c.movie_id, movie_directors.c.director_id
+    ):
+        directors[movie_id].append(director_id)
+
+    counts = Counter()
+    for movie_id, actor_id in db.session.query(
+        movie_actors.c.movie_id, movie_actors.c.actor_id
+    ):
+        for director_id in directors[movie_id]:
+            counts[(actor_id, director_id)] += 1
+
+    return dict(counts)
+
+
+@pytest.fixture
+def unlinked(catalog):
+    """
+    The seeded catalog without actor and director links, returning the removed
+    links by table.
+    """
+    links = {
+        table: db.session.query(table.c.movie_id, table.c[column]).all()
+        for table, column in (
+            (movie_actors, "actor_id"),
+            (movie_directors, "director_id"),
+        )
+    }
+    for table in (movie_actors, movie_directors, actor_director_collaborations):
+        db.session.execute(table.delete())
+    db.session.commit()
+
+    return links
+
+
+def add_links(tmp_path, table, links: list) -> None:
+    """
+    Add links of movie_actors or movie_directors through populate_db.py, from a
+    JSON file of slugs like the ones it reads.
+    """
+    if table is movie_actors:
+        model, field, column = Actor, "actor_slugs", "actor_id"
+    else:
+        model, field, column = Director, "director_slugs", "director_id"
+
+    movie_slugs = dict(db.session.query(Movie.id, Movie.slug))
+    other_slugs = dict(db.session.query(model.id, model.slug))
+    entries = defaultdict(list)
+    for movie_id, other_id in links:
+        entries[movie_slugs[movie_id]].append(other_slugs[other_id])
+
+    path = tmp_path / f"{table.name}.json"
+    path.write_text(
+        json.dumps(
+            [{"movie_slug": slug, field: slugs} for slug, slugs in entries.items()]
+        )
+    )
+
+    populate_db.add_association(
+        json_path=str(path),
+        left_model=Movie,
+        right_model=model,
+        association_table=table,
+        left_slug_field="movie_slug",
+        right_slug_field=field,
+        left_column_name="movie_id",
+        right_column_name=column,
+    )
+
+
+def test_incremental_collaborations_match_a_full_rebuild(
+    unlinked, tmp_path, monkeypatch
+):
+    # several chunks per batch
+    monkeypatch.setattr(populate_db, "MOVIE_ID_CHUNK_SIZE", 4)
+
+    actor_links, director_links = unlinked[movie_actors], unlinked[movie_directors]
+    batches = [
+        # directors of movies without actors yet, then actors of some of them
+        (movie_directors, director_links[:20]),
+        (movie_actors, actor_links[:30]),
+        # actors of movies without directors yet, then their directors
+        (movie_actors, actor_links[30:]),
+        (movie_directors, director_links[20:]),
+    ]
+    for table, links in batches:
+        add_links(tmp_path, table, links)
+        assert stored_collaborations() == expected_collaborations()
+
+    incremental = stored_collaborations()
+    populate_db.rebuild_collaborations()
+
+    assert incremental
+    assert stored_collaborations() == incremental
+
+
+def test_existing_links_are_not_counted_twice(unlinked, tmp_path):
+    actor_links, director_links = unlinked[movie_actors], unlinked[movie_directors]
+    add_links(tmp_path, movie_directors, director_links)
+    add_links(tmp_path, movie_actors, actor_links[:10])
+
+    # the second file repeats the links of the first one
+    add_links(tmp_path, movie_actors, actor_links[:20])
+
+    assert stored_collaborations() == expected_collaborations()
+
+
+def test_backfill_migration_matches_a_full_rebuild(catalog):
+    populate_db.rebuild_collaborations()
+    rebuilt = stored_collaborations()
+
+    # a database whose links were added before collaborations were maintained,
+    # with an out of date row
+    db.session.execute(actor_director_collaborations.delete())
+    db.session.execute(
+        actor_director_collaborations.insert(),
+        {"actor_id": 1, "director_id": 1, "collaborations": 99},
+    )
+    db.session.commit()
+
+    with db.engine.begin() as connection:
+        m0004_backfill_collaborations.upgrade(connection)
+
+    assert stored_collaborations() == rebuilt
@@ -0,0 +1,78 @@
+import gzip
+from datetime import timedelta
+
+import pytest
+
+from conftest import bump_data_version, db, Movie
+
+# large enough to be compressed, small enough to be cached by its data version
+LIST_URL = "/api/v1/movies?per_page=30"
+# small enough to be served uncompressed, with a content based ETag
+DETAIL_URL = "/api/v1/movies/1"
+
+
+def test_identity_response_has_strong_unsuffixed_etag(client):
+    response = client.get(DETAIL_URL)
+
+    assert response.headers.get("Content-Encoding") is None
+    assert not response.headers["ETag"].startswith("W/")
+    assert "Accept-Encoding" in response.headers["Vary"]
+
+
+def test_small_body_keeps_etag_when_client_accepts_gzip(client):
+    plain = client.get(DETAIL_URL)
+    accepting = client.get(DETAIL_URL, headers={"Accept-Encoding": "gzip"})
+
+    assert accepting.headers.get("Content-Encoding") is None
+    assert accepting.headers["ETag"] == plain.headers["ETag"]
+
+
+def test_encoded_body_has_encoding_suffixed_etag(client):
+    plain = client.get(LIST_URL)
+    encoded = client.get(LIST_URL, headers={"Accept-Encoding": "gzip"})
+
+    assert encoded.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(encoded.data) == plain.data
+    assert encoded.headers["ETag"] == plain.headers["ETag"][:-1] + '-gzip"'
+
+
+@pytest.mark.parametrize("url", [DETAIL_URL, LIST_URL])
+@pytest.mark.parametrize("encoding", [None, "gzip"])
+def test_matching_etag_is_not_modified(client, url, encoding):
+    headers = {"Accept-Encoding": encoding} if encoding else {}
+    etag = client.get(url, headers=headers).headers["ETag"]
+
+    response = client.get(url, headers={**headers, "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+    assert response.headers.get("Content-Encoding") is None
+    assert "Accept-Encoding" in response.headers["Vary"]
+
+
+def test_identity_etag_revalidates_a_gzip_client(client):
+    etag = client.get(LIST_URL).headers["ETag"]
+
+    response = client.get(
+        LIST_URL, headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+    )
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+
+def test_stale_etag_is_modified(client, catalog):
+    etags = [client.get(url).headers["ETag"] for url in (DETAIL_URL, LIST_URL)]
+
+    # SQLite's now() has second precision, stamp the change a minute later
+    movie = db.session.get(Movie, 1)
+    movie.title = "Renamed"
+    movie.updated_at = movie.updated_at + timedelta(minutes=1)
+    db.session.commit()
+    bump_data_version()
+
+    for url, etag in zip((DETAIL_URL, LIST_URL), etags):
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
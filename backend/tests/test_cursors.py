@@ -0,0 +1,137 @@
+import base64
+import json
+
+import pytest
+
+from conftest import MOVIE_COUNT, ACTOR_COUNT, DIRECTOR_COUNT, GENRE_COUNT
+
+
+def walk(client, url: str, resource: str = "movies") -> tuple:
+    """
+    Follow the cursors of a cursor paginated URL to the end.
+
+    Returns:
+        tuple: The ids of every page, in order, and the totals of every page.
+    """
+    ids, totals = [], []
+    cursor = ""
+    while cursor is not None:
+        response = client.get(f"{url}&cursor={cursor}").get_json()
+        assert response["status"] == "success", response
+
+        data = response["data"]
+        ids.extend(item["id"] for item in data[resource])
+        totals.append(data["total"])
+        cursor = data["next_cursor"]
+
+    return ids, totals
+
+
+def ratings_order(descending: bool) -> list:
+    """
+    The movie ids of the seeded catalog sorted by rating, ties broken by id.
+    """
+    ratings = {i + 1: round(5 + (i % 10) / 2, 1) for i in range(MOVIE_COUNT)}
+    sign = -1 if descending else 1
+
+    return sorted(ratings, key=lambda id: (sign * ratings[id], id))
+
+
+@pytest.mark.parametrize("ascending", ["true", "false"])
+def test_cursor_round_trip_visits_every_movie_once(client, ascending):
+    ids, _ = walk(
+        client, f"/api/v1/movies?sort_by=rating&ascending={ascending}&per_page=7"
+    )
+
+    assert ids == ratings_order(descending=ascending == "false")
+
+
+@pytest.mark.parametrize(
+    "resource, count", [("actors", ACTOR_COUNT), ("directors", DIRECTOR_COUNT)]
+)
+def test_cursor_round_trip_of_people(client, resource, count):
+    ids, _ = walk(
+        client,
+        f"/api/v1/{resource}?sort_by=name&ascending=false&per_page=5",
+        resource,
+    )
+
+    # names are "Actor 0", "Actor 1"... with 1-based ids, sorted as text
+    names = {i + 1: f"{resource[:-1].title()} {i}" for i in range(count)}
+    assert ids == sorted(names, key=names.get, reverse=True)
+
+
+def test_cursor_pages_match_offset_pages(client):
+    by_cursor, _ = walk(client, "/api/v1/movies?sort_by=title&per_page=4")
+
+    by_page = []
+    for page in range(1, MOVIE_COUNT // 4 + 2):
+        data = client.get(
+            f"/api/v1/movies?sort_by=title&per_page=4&page={page}"
+        ).get_json()["data"]
+        by_page.extend(movie["id"] for movie in data["movies"])
+
+    assert by_cursor == by_page
+
+
+def test_cursor_total_counts_the_whole_result(client):
+    _, totals = walk(client, "/api/v1/movies?sort_by=rating&per_page=5&count=exact")
+
+    assert totals == [MOVIE_COUNT] * len(totals)
+
+
+def test_cursor_total_counts_filtered_result(client):
+    ids, totals = walk(client, "/api/v1/movies?genre_id=1&per_page=2&count=exact")
+
+    assert len(ids) == MOVIE_COUNT // GENRE_COUNT
+    assert totals == [len(ids)] * len(totals)
+
+
+def test_last_page_has_no_next_cursor(client):
+    data = client.get(f"/api/v1/movies?cursor=&per_page={MOVIE_COUNT}").get_json()[
+        "data"
+    ]
+
+    assert len(data["movies"]) == MOVIE_COUNT
+    assert data["next_cursor"] is None
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-base64!",
+        base64.urlsafe_b64encode(b"[1, 2]").decode(),
+        base64.urlsafe_b64encode(b"{not json").decode(),
+    ],
+)
+def test_malformed_cursor_fails(client, cursor):
+    response = client.get(f"/api/v1/movies?sort_by=rating&cursor={cursor}")
+
+    assert response.get_json() == {
+        "code": 400,
+        "message": "invalid cursor",
+        "status": "fail",
+    }
+
+
+def test_cursor_of_another_sort_fails(client):
+    data = client.get("/api/v1/movies?sort_by=rating&per_page=3&cursor=").get_json()[
+        "data"
+    ]
+
+    for url in [
+        "/api/v1/movies?sort_by=title",
+        "/api/v1/movies?sort_by=rating&ascending=false",
+    ]:
+        result = client.get(f"{url}&cursor={data['next_cursor']}").get_json()
+        assert result["message"] == "invalid cursor"
+
+
+def test_forged_cursor_id_fails(client):
+    cursor = base64.urlsafe_b64encode(
+        json.dumps(["rating", False, 6.0, "x"]).encode()
+    ).decode()
+
+    result = client.get(f"/api/v1/movies?sort_by=rating&cursor={cursor}").get_json()
+
+    assert result["message"] == "invalid cursor"
@@ -0,0 +1,33 @@
+import pytest
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/api/v1/movies/abc",
+        "/api/v1/actors/abc",
+        "/api/v1/directors/abc",
+        "/api/v1/movies/abc/actors",
+        "/api/v1/actors/abc/movies",
+        "/api/v1/directors/abc/movies",
+        "/api/v1/genres/abc/movies",
+    ],
+)
+def test_non_numeric_id_fails_without_validators(client, url):
+    response = client.get(url, headers={"If-None-Match": "*"})
+
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "code": 400,
+        "message": "invalid id",
+        "status": "fail",
+    }
+    assert "ETag" not in response.headers
+    assert "Last-Modified" not in response.headers
+
+
+def test_missing_id_is_not_found(client):
+    response = client.get("/api/v1/movies/999")
+
+    assert response.get_json()["message"] == "not found"
+    assert "ETag" not in response.headers
@@ -1,14 +1,73 @@
 import sys
+import json
+import base64
+import hashlib
+from functools import wraps
+from flask import g, request, has_request_context
+from werkzeug.http import is_resource_modified
 from enum import Enum
-from app_init import db
+from datetime import datetime
+from cache import create_cache
+from compression import (
+    ENCODINGS,
+    encoded_etag,
+    compress_variants,
+    variant_response,
+)
+from app_init import db, app
+from sqlalchemy import (
+    or_,
+    and_,
+    tuple_,
+    func,
+    select,
+    inspect,
+    union_all,
+    literal,
+    null,
+)
+from sqlalchemy.sql import table, column, literal_column
+from sqlalchemy.sql import operators
 from flask_sqlalchemy.query import Query
+from sqlalchemy.orm import load_only, selectinload
+from schema.compiled import prepare_dump
+from models.data_version import DataVersion
 
 
 class Pagination:
-    def __init__(self, page, per_page) -> None:
+    def __init__(self, page, per_page, cursor=None, count=None) -> None:
         self.page = page
         self.per_page = per_page
 
+        # opaque keyset cursor, None outside of cursor mode
+        self.cursor = cursor
+
+        # how to compute the total: "exact", "estimate" or "none", None for the
+        # mode's default (exact with pages, none with cursors)
+        self.count = count
+
+
+COUNT_MODES = ("exact", "estimate", "none")
+
+# exact totals per normalized filter signature, dropped when the data version changes
+count_cache = create_cache("counts", ttl=app.config["COUNT_CACHE_TTL"])
+
+
+# serialized responses of the read-mostly endpoints, see cached_response
+response_cache = create_cache(
+    "responses",
+    ttl=app.config["RESPONSE_CACHE_TTL"],
+    max_entries=app.config["RESPONSE_CACHE_MAX_ENTRIES"],
+)
+
+# validators of instance responses per route and query string, see
+# instance_validators
+validator_cache = create_cache(
+    "validators",
+    ttl=app.config["RESPONSE_CACHE_TTL"],
+    max_entries=app.config["RESPONSE_CACHE_MAX_ENTRIES"],
+)
+
 
 class Status(Enum):
     SUCCESS = {"status": "success", "code": 200}
@@ -17,7 +76,9 @@ class Status(Enum):
     NOT_FOUND = {"status": "fail", "code": 404}
 
 
-def query_pages(query, schema, pagination: Pagination) -> dict:
+def query_pages(
+    query, schema, pagination: Pagination, sort_key=None, id_field=None, fields=None
+) -> dict:
     """
     Paginate a SQLAlchemy query and serialize the results using the provided schema.
 
@@ -25,14 +86,27 @@ def query_pages(query, schema, pagination: Pagination) -> dict:
         query (SQLAlchemy Query): The SQLAlchemy query to paginate.
         schema (Marshmallow Schema): The schema to serialize the results.
         pagination (Pagination): An instance of Pagination containing page and per_page values.
+        sort_key (SQLAlchemy Sort Expression, optional): The active sort, required for cursor mode.
+        id_field (SQLAlchemy Column, optional): The id tiebreaker, required for cursor mode.
+        fields (tuple, optional): The sparse fieldset to serialize, None for all fields.
 
     Returns:
         dict: A dictionary containing the status and paginated data.
     """
+    if pagination.count is not None and pagination.count not in COUNT_MODES:
+        return {**Status.FAIL.value, "message": "invalid count"}
+
+    if pagination.cursor is not None and sort_key is not None:
+        return query_cursor_page(query, schema, pagination, sort_key, id_field, fields)
+
     # make a SQL query
     try:
-        results = db.paginate(query, page=pagination.page, per_page=pagination.per_page)
-        instances = schema.dump(results.items, many=True)
+        page_query, serializer = prepare_dump(query, schema, fields)
+        results = page_query.paginate(
+            page=pagination.page, per_page=pagination.per_page, count=False
+        )
+        instances = serializer.dump(results.items, many=True)
+        total = count_query(query, pagination.count or "exact")
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         return {**Status.ERROR.value, "message": "data fetch failed"}
@@ -41,14 +115,362 @@ def query_pages(query, schema, pagination: Pagination) -> dict:
         **Status.SUCCESS.value,
         "data": {
             "instances": instances,
-            "total": results.total,
+            "total": total,
             "page": pagination.page,
             "per_page": pagination.per_page,
         },
     }
 
 
-def query_by_id(model, id, schema) -> dict:
+def count_signature(query) -> tuple:
+    """
+    Normalize a query into a hashable signature of its filters. Filters are applied
+    in a fixed order, so the same search term, exact and range filters always
+    produce the same SQL and parameters.
+
+    Args:
+        query (SQLAlchemy Query): The SQLAlchemy query to sign.
+
+    Returns:
+        tuple: The SQL text and sorted parameters of the unordered query.
+    """
+    compiled = query.order_by(None).statement.compile(dialect=db.engine.dialect)
+
+    # expanding IN parameters are lists
+    params = {
+        name: tuple(value) if isinstance(value, list) else value
+        for name, value in compiled.params.items()
+    }
+
+    return str(compiled), tuple(sorted(params.items()))
+
+
+def estimate_count(query):
+    """
+    Estimate the number of rows of a query from PostgreSQL's planner statistics:
+    the table's reltuples when unfiltered, the EXPLAIN row estimate otherwise.
+
+    Args:
+        query (SQLAlchemy Query): The SQLAlchemy query to estimate.
+
+    Returns:
+        int or None: The estimate, None if the database cannot provide one.
+    """
+    if db.engine.dialect.name != "postgresql":
+        return None
+
+    if query.whereclause is None:
+        table = query.column_descriptions[0]["entity"].__table__
+        reltuples = db.session.execute(
+            db.text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": table.name},
+        ).scalar()
+        # a table that was never analyzed reports -1
+        if reltuples is not None and reltuples >= 0:
+            return int(reltuples)
+
+    compiled = query.order_by(None).statement.compile(
+        dialect=db.engine.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    plan = (
+        db.session.connection()
+        .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+        .scalar()
+    )
+
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_query(query, mode: str):
+    """
+    Count the rows of a query according to the requested count mode.
+
+    Args:
+        query (SQLAlchemy Query): The SQLAlchemy query to count.
+        mode (str): "exact" for a COUNT cached per filter signature, "estimate" for
+            a planner estimate, "none" to skip counting.
+
+    Returns:
+        int or None: The total, None when counting was skipped.
+    """
+    if mode == "none":
+        return None
+
+    if mode == "estimate":
+        estimate = estimate_count(query)
+        if estimate is not None:
+            return estimate
+
+    version = get_data_version()
+    signature = count_signature(query)
+    total = count_cache.get(signature, version)
+    if total is None:
+        total = query.order_by(None).count()
+        count_cache.set(signature, total, version)
+
+    return total
+
+
+def query_facets(query, id_field, facets: dict, joins=()) -> dict:
+    """
+    Count the distinct instances of a filtered query per value of every facet, in
+    a single grouped query: GROUPING SETS on PostgreSQL, a UNION ALL of one GROUP BY
+    per facet elsewhere. Results and the total are kept in the count cache, the
+    total under the same signature query_pages counts the filtered query with.
+
+    Args:
+        query (SQLAlchemy Query): The filtered, unordered SQLAlchemy query.
+        id_field (SQLAlchemy Column): The id of the counted instances.
+        facets (dict): Facet name -> SQL expression of the facet's value.
+        joins (list): (target, onclause) outer joins the facet expressions need.
+
+    Returns:
+        dict: A dictionary containing the status, the total and, per facet, the
+            non-null values with their counts, most frequent first.
+    """
+    try:
+        version = get_data_version()
+        signature = count_signature(query)
+        key = ("facets", tuple(facets), signature)
+
+        result = count_cache.get(key, version)
+        if result is None:
+            result = count_facets(query, id_field, facets, joins)
+            count_cache.set(key, result, version)
+            count_cache.set(signature, result["total"], version)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return {**Status.ERROR.value, "message": "data fetch failed"}
+
+    return {**Status.SUCCESS.value, "data": result}
+
+
+def count_facets(query, id_field, facets: dict, joins=()) -> dict:
+    """
+    Run the grouped query of query_facets.
+
+    Args:
+        query (SQLAlchemy Query): The filtered, unordered SQLAlchemy query.
+        id_field (SQLAlchemy Column): The id of the counted instances.
+        facets (dict): Facet name -> SQL expression of the facet's value.
+        joins (list): (target, onclause) outer joins the facet expressions need.
+
+    Returns:
+        dict: The total and the value counts of every facet.
+    """
+    for target, onclause in joins:
+        query = query.outerjoin(target, onclause)
+
+    # facet values are computed once, the grouping then works on plain columns
+    rows = query.with_entities(
+        id_field.label("id"),
+        *(
+            expression.label(f"facet_{index}")
+            for index, expression in enumerate(facets.values())
+        ),
+    ).cte("faceted")
+    columns = [rows.c[f"facet_{index}"] for index in range(len(facets))]
+    count = func.count(rows.c.id.distinct())
+
+    if db.engine.dialect.name == "postgresql":
+        statement = select(func.grouping(*columns), *columns, count).group_by(
+            func.grouping_sets(*(tuple_(column) for column in columns), tuple_())
+        )
+        # grouping() has a zero bit for the grouped column, none for the total
+        everything = (1 << len(columns)) - 1
+        sets = {
+            everything ^ (1 << (len(columns) - 1 - i)): i for i in range(len(columns))
+        }
+        sets[everything] = len(columns)
+
+        grouped = []
+        for grouping, *values, total in db.session.execute(statement):
+            index = sets[grouping]
+            grouped.append((index, [*values, None][index], total))
+    else:
+        statement = union_all(
+            *(
+                select(literal(index), column, count).group_by(column)
+                for index, column in enumerate(columns)
+            ),
+            select(literal(len(columns)), null(), count),
+        )
+        grouped = db.session.execute(statement).all()
+
+    result = {"total": 0, "facets": {name: [] for name in facets}}
+    names = list(facets)
+    for index, value, total in grouped:
+        if index == len(names):
+            result["total"] = total
+        elif value is not None:
+            result["facets"][names[index]].append({"value": value, "count": total})
+
+    for values in result["facets"].values():
+        values.sort(key=lambda entry: (-entry["count"], entry["value"]))
+
+    return result
+
+
+def encode_cursor(sort_field, descending: bool, value, id) -> str:
+    """
+    Encode the position after a row as an opaque cursor.
+
+    Args:
+        sort_field (SQLAlchemy Column): The active sort field.
+        descending (bool): Whether the sort is descending.
+        value: The row's value of the sort field.
+        id (int): The row's id.
+
+    Returns:
+        str: The URL-safe cursor.
+    """
+    payload = json.dumps([sort_field.key, descending, value, id])
+
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str, sort_field, descending: bool):
+    """
+    Decode a cursor, checking it was issued for the active sort.
+
+    Args:
+        cursor (str): The cursor sent by the client.
+        sort_field (SQLAlchemy Column): The active sort field.
+        descending (bool): Whether the sort is descending.
+
+    Returns:
+        tuple: The sort value and id of the last row of the previous page.
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another sort.
+    """
+    try:
+        key, cursor_descending, value, id = json.loads(base64.urlsafe_b64decode(cursor))
+    except Exception as e:
+        raise ValueError(f"malformed cursor: {e}")
+
+    if key != sort_field.key or cursor_descending != descending:
+        raise ValueError("cursor does not match the requested sort")
+
+    return value, int(id)
+
+
+def apply_keyset_filter(
+    query, sort_field, id_field, descending: bool, value, id
+) -> Query:
+    """
+    Seek a query past the given row, with PostgreSQL's NULL ordering (NULLS LAST
+    ascending, NULLS FIRST descending) and ids always ascending.
+
+    Args:
+        query (SQLAlchemy Query): The SQLAlchemy query to filter.
+        sort_field (SQLAlchemy Column): The active sort field.
+        id_field (SQLAlchemy Column): The id tiebreaker.
+        descending (bool): Whether the sort is descending.
+        value: The sort value of the last row of the previous page.
+        id (int): The id of the last row of the previous page.
+
+    Returns:
+        SQLAlchemy Query: The query restricted to rows after the given one.
+    """
+    if sort_field.compare(id_field.expression):
+        return query.filter(id_field > id)
+
+    if not descending and value is not None and not sort_field.nullable:
+        # a plain row comparison an index on (sort_field, id) can serve
+        return query.filter(tuple_(sort_field, id_field) > tuple_(value, id))
+
+    if value is None:
+        after = and_(sort_field.is_(None), id_field > id)
+        # descending puts NULLs first, every non-NULL row is still to come
+        return query.filter(or_(after, sort_field.isnot(None)) if descending else after)
+
+    past_value = sort_field < value if descending else sort_field > value
+    after = or_(past_value, and_(sort_field == value, id_field > id))
+    # ascending puts NULLs last, they are all still to come
+    return query.filter(after if descending else or_(after, sort_field.is_(None)))
+
+
+def query_cursor_page(
+    query, schema, pagination: Pagination, sort_key, id_field, fields=None
+):
+    """
+    Fetch a page of a SQLAlchemy query with keyset pagination. The page is found with
+    an index seek past the previous page instead of an OFFSET, and no total is counted,
+    so every page costs the same at any depth.
+
+    Args:
+        query (SQLAlchemy Query): The SQLAlchemy query to paginate.
+        schema (Marshmallow Schema): The schema to serialize the results.
+        pagination (Pagination): An instance of Pagination containing per_page and cursor values.
+        sort_key (SQLAlchemy Sort Expression): The active sort.
+        id_field (SQLAlchemy Column): The id tiebreaker.
+        fields (tuple, optional): The sparse fieldset to serialize, None for all fields.
+
+    Returns:
+        dict: A dictionary containing the status, the page and the next cursor.
+    """
+    sort_field = sort_key.element
+    descending = sort_key.modifier is operators.desc_op
+
+    # the total counts the whole result, not only the rows past the cursor
+    base_query = query
+
+    try:
+        if pagination.cursor:
+            value, id = decode_cursor(pagination.cursor, sort_field, descending)
+            query = apply_keyset_filter(
+                query, sort_field, id_field, descending, value, id
+            )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return {**Status.FAIL.value, "message": "invalid cursor"}
+
+    order = (
+        sort_field.desc().nulls_first() if descending else sort_field.asc().nulls_last()
+    )
+
+    page_query, serializer = prepare_dump(query, schema, fields, sort_field, id_field)
+
+    try:
+        # one extra row tells whether there is a next page
+        items = (
+            page_query.order_by(None)
+            .order_by(order, id_field)
+            .limit(pagination.per_page + 1)
+            .all()
+        )
+        page = items[: pagination.per_page]
+        instances = serializer.dump(page, many=True)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return {**Status.ERROR.value, "message": "data fetch failed"}
+
+    try:
+        total = count_query(base_query, pagination.count or "none")
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return {**Status.ERROR.value, "message": "data fetch failed"}
+
+    next_cursor = None
+    if len(items) > pagination.per_page:
+        last = page[-1]
+        next_cursor = encode_cursor(
+            sort_field, descending, getattr(last, sort_field.key), last.id
+        )
+
+    return {
+        **Status.SUCCESS.value,
+        "data": {
+            "instances": instances,
+            "total": total,
+            "per_page": pagination.per_page,
+            "next_cursor": next_cursor,
+        },
+    }
+
+
+def query_by_id(model, id, schema, fields=None) -> dict:
     """
     Query a single instance by its ID and serialize it using the provided schema.
 
@@ -56,13 +478,16 @@ def query_by_id(model, id, schema) -> dict:
         model (SQLAlchemy Model): The SQLAlchemy model to query.
         id (str): The ID of the instance to query.
         schema (Marshmallow Schema): The schema to serialize the instance.
+        fields (tuple, optional): The sparse fieldset to serialize, None for all fields.
 
     Returns:
         dict: A dictionary containing the status and data of the query.
     """
+    query, serializer = prepare_dump(model.query, schema, fields)
+
     try:
         int_id = int(id)
-        instance = schema.dump(model.query.get(int_id))
+        instance = serializer.dump(query.filter(model.id == int_id).first())
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         return {**Status.FAIL.value, "message": "invalid id"}
@@ -73,39 +498,245 @@ def query_by_id(model, id, schema) -> dict:
     return {**Status.SUCCESS.value, "data": {"instance": instance}}
 
 
-def query_relations_by_id(model, id, relation_name, relation_schema) -> dict:
+def query_batch(model, key: str, values: list, schema, fields=None) -> dict:
+    """
+    Query several instances by ID or slug in a single IN query and serialize them
+    using the provided schema, in the requested order.
+
+    Args:
+        model (SQLAlchemy Model): The SQLAlchemy model to query.
+        key (str): The looked up column, "id" or "slug".
+        values (list): The IDs or slugs to look up, without duplicates.
+        schema (Marshmallow Schema): The schema to serialize the instances.
+        fields (tuple, optional): The sparse fieldset to serialize, None for all fields.
+
+    Returns:
+        dict: A dictionary containing the status, the instances found and the
+            values that matched nothing.
+    """
+    key_column = getattr(model, key)
+    query, serializer = prepare_dump(
+        model.query.filter(key_column.in_(values)), schema, fields, key_column
+    )
+
+    try:
+        found = {getattr(row, key): row for row in query.all()}
+        instances = serializer.dump(
+            [found[value] for value in values if value in found], many=True
+        )
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return {**Status.ERROR.value, "message": "data fetch failed"}
+
+    return {
+        **Status.SUCCESS.value,
+        "data": {
+            "instances": instances,
+            "missing": [value for value in values if value not in found],
+        },
+    }
+
+
+def query_relations_by_id(
+    model,
+    id,
+    relation_name,
+    relation_schema,
+    pagination: Pagination,
+    sort_key=None,
+    fields=None,
+    range_filters=None,
+) -> dict:
     """
-    Query a relation of a model by its ID and serialize it using the provided schema.
+    Query a page of a relation of a model by its ID, or the whole relation, and
+    serialize it using the provided schema. The instances are read with a single
+    join of the relation's table and the association table, the parent row is never
+    loaded: an EXISTS check tells a missing parent from an empty relation when no
+    instance comes back.
 
     Args:
         model (SQLAlchemy Model): The SQLAlchemy model to query.
         id (str): The ID of the instance to query.
         relation_name (str): The name of the relation to fetch.
         relation_schema (Marshmallow Schema): The schema to serialize the relation instances.
+        pagination (Pagination): An instance of Pagination containing page and per_page
+            values, None for the whole relation.
+        sort_key (SQLAlchemy Sort Expression, optional): The sort, related IDs by default.
+        fields (tuple, optional): The sparse fieldset to serialize, None for all fields.
+        range_filters (dict, optional): Range filters on the related instances.
 
     Returns:
-        dict: A dictionary containing the status and data of the relation query.
+        dict: A dictionary containing the status and data of the relation.
     """
     try:
         int_id = int(id)
-        instance = model.query.get(int_id)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         return {**Status.FAIL.value, "message": "invalid id"}
 
-    if not instance:
-        return {**Status.NOT_FOUND.value, "message": "not found"}
+    relationship = getattr(model, relation_name).property
+    related = relationship.mapper.class_
+    owner_column = association_column(relationship.secondary, model)
+    related_column = association_column(relationship.secondary, related)
+
+    if sort_key is None:
+        sort_key = related.id.asc()
+    query = related.query.join(
+        relationship.secondary, related_column == related.id
+    ).filter(owner_column == int_id)
+    query = apply_range_filters(query, range_filters or dict())
+    query = query.order_by(sort_key, related.id)
+
+    if pagination is None:
+        try:
+            all_query, serializer = prepare_dump(query, relation_schema, fields)
+            instances = serializer.dump(all_query.all(), many=True)
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return {**Status.ERROR.value, "message": "data fetch failed"}
+
+        result = {
+            **Status.SUCCESS.value,
+            "data": {"instances": instances, "total": len(instances)},
+        }
+    else:
+        result = query_pages(
+            query, relation_schema, pagination, sort_key, related.id, fields
+        )
+    if result["status"] != "success":
+        return result
+
+    if not result["data"]["instances"]:
+        try:
+            found = db.session.query(
+                model.query.filter(model.id == int_id).exists()
+            ).scalar()
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return {**Status.ERROR.value, "message": "data fetch failed"}
+
+        if not found:
+            return {**Status.NOT_FOUND.value, "message": "not found"}
+
+    result["data"][relation_name] = result["data"].pop("instances")
+
+    return result
+
+
+def association_column(association_table, model):
+    """
+    Get the column of an association table holding the IDs of a model.
+
+    Args:
+        association_table (SQLAlchemy Table): The association table.
+        model (SQLAlchemy Model): The model referenced by the column.
+
+    Returns:
+        SQLAlchemy Column: The foreign key column referencing the model's ID.
+    """
+    return next(
+        column
+        for column in association_table.columns
+        if column.references(model.__table__.c.id)
+    )
+
+
+def include_relations(model, instances: list, relations: dict) -> None:
+    """
+    Embed relations into serialized instances, loading each relation of every
+    instance in one batched SELECT ... IN query, whatever the number of instances.
 
+    Args:
+        model (SQLAlchemy Model): The model of the instances.
+        instances (list): Serialized instances, each with its "id".
+        relations (dict): Relationship name -> schema serializing its instances.
+    """
+    if not instances or not relations:
+        return
+
+    owners = (
+        model.query.options(
+            load_only(model.id),
+            *(selectinload(getattr(model, name)) for name in relations),
+        )
+        .filter(model.id.in_([instance["id"] for instance in instances]))
+        .all()
+    )
+    owners = {owner.id: owner for owner in owners}
+
+    for instance in instances:
+        # an owner deleted since the instances were queried has no relations
+        owner = owners.get(instance["id"])
+        for name, schema in relations.items():
+            related = getattr(owner, name) if owner is not None else []
+            related = sorted(related, key=lambda related: related.id)
+            instance[name] = schema.dump(related, many=True)
+
+
+def query_collaborators(
+    model,
+    id,
+    collaborator_model,
+    own_column,
+    collaborator_column,
+    count_column,
+    schema,
+    pagination: Pagination,
+) -> dict:
+    """
+    Query the people an actor or director worked with, most collaborations first.
+
+    Args:
+        model (SQLAlchemy Model): The model of the person to query.
+        id (str): The ID of the person to query.
+        collaborator_model (SQLAlchemy Model): The model of their collaborators.
+        own_column (Column): The collaborations column holding the person's ID.
+        collaborator_column (Column): The collaborations column holding collaborator IDs.
+        count_column (Column): The collaborations column holding the counts.
+        schema (Marshmallow Schema): The schema to serialize the collaborators.
+        pagination (Pagination): An instance of Pagination containing page and per_page values.
+
+    Returns:
+        dict: A dictionary containing the status and paginated collaborators.
+    """
     try:
-        relation = getattr(instance, relation_name)
-        instances = relation_schema.dump(relation, many=True)
+        int_id = int(id)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
-        return {**Status.FAIL.value, "message": "relation fetch failed"}
+        return {**Status.FAIL.value, "message": "invalid id"}
+
+    try:
+        if db.session.get(model, int_id) is None:
+            return {**Status.NOT_FOUND.value, "message": "not found"}
+
+        query = (
+            db.session.query(collaborator_model, count_column)
+            .join(collaborator_model, collaborator_model.id == collaborator_column)
+            .filter(own_column == int_id)
+        )
+        total = query.count()
+        rows = (
+            query.order_by(count_column.desc(), collaborator_model.id)
+            .limit(pagination.per_page)
+            .offset((pagination.page - 1) * pagination.per_page)
+            .all()
+        )
+        people = schema.dump([person for person, _ in rows], many=True)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return {**Status.ERROR.value, "message": "data fetch failed"}
 
     return {
         **Status.SUCCESS.value,
-        "data": {relation_name: instances},
+        "data": {
+            "collaborators": [
+                {**person, "collaborations": count}
+                for person, (_, count) in zip(people, rows)
+            ],
+            "total": total,
+            "page": pagination.page,
+            "per_page": pagination.per_page,
+        },
     }
 
 
@@ -122,7 +753,11 @@ def parse_pagination_parameters(request_args) -> Pagination:
     page = int(request_args.get("page", 1))
     per_page = int(request_args.get("per_page", 10))
 
-    return Pagination(page, per_page)
+    # an empty cursor starts cursor mode at the first page
+    cursor = request_args.get("cursor")
+    count = request_args.get("count")
+
+    return Pagination(page, per_page, cursor, count)
 
 
 def parse_sort_parameters(request_args, sort_fields):
@@ -151,6 +786,84 @@ def parse_sort_parameters(request_args, sort_fields):
     return chosen_field.desc()
 
 
+def parse_fields_parameter(request_args, schema):
+    """
+    Parse the comma separated ?fields= sparse fieldset of a request.
+
+    Args:
+        request_args (dict): The request arguments.
+        schema (Marshmallow Schema): The schema the fields are chosen from.
+
+    Returns:
+        tuple or None: The requested fields in Meta.fields order, all of Meta.fields
+            when the parameter is absent, or None if it names an unknown field.
+    """
+    fields = request_args.get("fields")
+    if fields is None:
+        return tuple(schema.Meta.fields)
+
+    requested = {field.strip() for field in fields.split(",")} - {""}
+    if not requested or not requested <= set(schema.Meta.fields):
+        return None
+
+    return tuple(field for field in schema.Meta.fields if field in requested)
+
+
+def parse_batch_parameters(request_args):
+    """
+    Parse the comma separated ?ids= or ?slugs= of a batch lookup.
+
+    Args:
+        request_args (dict): The request arguments, with exactly one of ids and slugs.
+
+    Returns:
+        tuple or None: The looked up column ("id" or "slug") and the values in
+            request order without duplicates, or None if the parameters are invalid
+            or name more than BATCH_MAX_SIZE values.
+    """
+    ids, slugs = request_args.get("ids"), request_args.get("slugs")
+    if (ids is None) == (slugs is None):
+        return None
+
+    key = "id" if ids is not None else "slug"
+    values = [value.strip() for value in (ids or slugs).split(",")]
+    values = list(dict.fromkeys(value for value in values if value))
+
+    if key == "id":
+        try:
+            values = list(dict.fromkeys(int(value) for value in values))
+        except ValueError:
+            return None
+
+    if not 1 <= len(values) <= app.config["BATCH_MAX_SIZE"]:
+        return None
+
+    return key, values
+
+
+def parse_include_parameter(request_args, relations: dict):
+    """
+    Parse the comma separated ?include= list of relations to embed.
+
+    Args:
+        request_args (dict): The request arguments.
+        relations (dict): Relationship name -> schema of the includable relations.
+
+    Returns:
+        dict or None: The requested relations and their schemas, empty when the
+            parameter is absent, or None if it names an unknown relation.
+    """
+    include = request_args.get("include")
+    if include is None:
+        return dict()
+
+    requested = {name.strip() for name in include.split(",")} - {""}
+    if not requested or not requested <= relations.keys():
+        return None
+
+    return {name: schema for name, schema in relations.items() if name in requested}
+
+
 def parse_exact_filters(request_args, exact_filters) -> dict:
     """
     Parse exact filter parameters from request arguments.
@@ -233,6 +946,87 @@ def apply_range_filters(query, filters) -> Query:
     return query
 
 
+def parse_relation_filters(request_args, relation_filters: dict):
+    """
+    Parse relation filter parameters from request arguments. A parameter holds
+    comma separated slugs of which any must match, its "_id" variant comma separated
+    ids, and both are repeated for groups that must all match:
+    ?genre=action,drama&genre=sci-fi asks for action or drama movies that are also
+    sci-fi, ?genre_id=1,2 for movies of the genres 1 or 2.
+
+    Args:
+        request_args (dict): The request arguments containing filter parameters.
+        relation_filters (dict): Parameter name -> (association table, related
+            model) of the valid relation filters.
+
+    Returns:
+        dict or None: (association table, related model) -> list of value groups,
+            integers for ids and strings for slugs, or None if a group is empty, an
+            id is not a number or the filters name more than BATCH_MAX_SIZE values.
+    """
+    filters = dict()
+    total = 0
+    for name, relation in relation_filters.items():
+        groups = []
+        for parameter in (name, f"{name}_id"):
+            for group in request_args.getlist(parameter):
+                values = [value.strip() for value in group.split(",")]
+                values = list(dict.fromkeys(value for value in values if value))
+                if not values:
+                    return None
+                if parameter != name:
+                    if not all(value.isdecimal() for value in values):
+                        return None
+                    values = [int(value) for value in values]
+                groups.append(values)
+                total += len(values)
+
+        if groups:
+            filters[relation] = groups
+
+    if total > app.config["BATCH_MAX_SIZE"]:
+        return None
+
+    return filters
+
+
+def apply_relation_filters(query, model, filters) -> Query:
+    """
+    Apply relation filters to a SQLAlchemy query, each value group as an
+    id IN (SELECT ...) semi-join on the association table, so the query still
+    returns every instance once and stays paginated by the database. Unlike a
+    correlated EXISTS, which SQLite evaluates row by row, the subquery is driven by
+    the association table's reverse index on both SQLite and PostgreSQL.
+
+    Args:
+        query (SQLAlchemy Query): The SQLAlchemy query on the model to filter.
+        model (SQLAlchemy Model): The model of the filtered instances.
+        filters (dict): A dictionary containing the relation filters to apply.
+
+    Returns:
+        SQLAlchemy Query: The modified query with applied relation filters.
+    """
+    for (association_table, related), groups in filters.items():
+        owner_column = association_column(association_table, model)
+        related_column = association_column(association_table, related)
+
+        for values in groups:
+            ids = [value for value in values if isinstance(value, int)]
+            slugs = [value for value in values if isinstance(value, str)]
+
+            matches = []
+            if ids:
+                matches.append(related_column.in_(ids))
+            if slugs:
+                slug_ids = select(related.id).where(related.slug.in_(slugs))
+                matches.append(related_column.in_(slug_ids))
+
+            semi_join = select(owner_column).where(or_(*matches))
+            query = query.filter(model.id.in_(semi_join))
+
+    return query
+
+
 def apply_search_filters(query, search_term, search_fields) -> Query:
     """
     Apply search filters to a SQLAlchemy query.
@@ -250,6 +1044,428 @@ def apply_search_filters(query, search_term, search_fields) -> Query:
 
     # Apply the search filter to the query
     for field in search_fields:
-        query = query.filter(field.ilike(f"%{search_term}%"))
+        query = query.filter(search_condition(field, search_term))
+
+    return query
+
+
+def apply_search_ranking(query, search_term, search_fields) -> Query:
+    """
+    Orders a searched query by relevance, best matches first. Must be applied before
+    any other ordering, which then only breaks ties. Does nothing without a search
+    index for the searched table.
+
+    Args:
+        query (SQLAlchemy Query): The SQLAlchemy query to order.
+        search_term (str): The search term the query was filtered by.
+        search_fields (list): The fields the query was searched by.
+
+    Returns:
+        SQLAlchemy Query: The query ordered by relevance.
+    """
+    if not search_term:
+        return query
+
+    for field in search_fields:
+        if not search_index_available(field.table.name):
+            continue
+
+        if db.engine.dialect.name == "postgresql":
+            query = query.order_by(func.word_similarity(search_term, field).desc())
+        elif len(search_term) >= FTS_MIN_TERM_LENGTH:
+            # bm25 scores are negative, lower is better
+            fts = fts_table(field)
+            rank = (
+                select(fts.c.rank)
+                .where(fts_match(field, search_term), fts.c.rowid == field.table.c.id)
+                .scalar_subquery()
+            )
+            query = query.order_by(rank.asc())
 
     return query
+
+
+# the trigram tokenizer cannot match fewer than three characters
+FTS_MIN_TERM_LENGTH = 3
+
+# table name -> whether its search index exists, filled on first use
+search_indexes = {}
+
+
+def search_index_available(table_name: str) -> bool:
+    """
+    Checks whether the search index migration was applied for a table: the pg_trgm
+    extension on PostgreSQL, the table's FTS5 table on SQLite.
+
+    Args:
+        table_name (str): The name of the searched table.
+
+    Returns:
+        bool: True if the searches on the table can use the index.
+    """
+    if table_name not in search_indexes:
+        dialect = db.engine.dialect.name
+        if dialect == "postgresql":
+            available = db.session.execute(
+                db.text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            ).first()
+        elif dialect == "sqlite":
+            available = inspect(db.engine).has_table(f"{table_name}_fts")
+        else:
+            available = False
+
+        search_indexes[table_name] = bool(available)
+
+    return search_indexes[table_name]
+
+
+def fts_table(field):
+    """
+    Returns the SQLite FTS5 table indexing a field.
+    """
+    return table(f"{field.table.name}_fts", column("rowid"), column("rank"))
+
+
+def fts_match(field, search_term: str):
+    """
+    Returns the FTS5 MATCH condition finding a term anywhere in a field, the
+    equivalent of field ILIKE '%term%' for terms of three characters or more.
+    """
+    phrase = search_term.replace('"', '""')
+    return literal_column(fts_table(field).name).op("MATCH")(
+        f'{field.key} : "{phrase}"'
+    )
+
+
+def search_condition(field, search_term: str):
+    """
+    Returns the condition finding a term anywhere in a field. The trigram indexes
+    serve ILIKE directly on PostgreSQL, SQLite goes through its FTS5 table.
+
+    Args:
+        field (SQLAlchemy Column): The searched field.
+        search_term (str): The search term.
+
+    Returns:
+        SQLAlchemy expression: The search condition.
+    """
+    if (
+        db.engine.dialect.name == "sqlite"
+        and len(search_term) >= FTS_MIN_TERM_LENGTH
+        and search_index_available(field.table.name)
+    ):
+        fts = fts_table(field)
+        matches = select(fts.c.rowid).where(fts_match(field, search_term))
+        return field.table.c.id.in_(matches)
+
+    return field.ilike(f"%{search_term}%")
+
+
+def get_data_stamp(name: str = "catalog") -> tuple:
+    """
+    Get the current version of a data set and the time of its last change. Within
+    a request they are read once, so the caches and validators of a request share
+    one query and one version.
+
+    Args:
+        name (str): The name of the data set. Defaults to "catalog".
+
+    Returns:
+        tuple: The version, 0 if the data set was never versioned, and the time of
+            its last change or None.
+    """
+    stamps = g.setdefault("data_stamps", dict()) if has_request_context() else None
+    if stamps is not None and name in stamps:
+        return stamps[name]
+
+    row = (
+        db.session.query(DataVersion.version, DataVersion.updated_at)
+        .filter(DataVersion.name == name)
+        .first()
+    )
+    stamp = (row.version or 0, row.updated_at) if row is not None else (0, None)
+
+    if stamps is not None:
+        stamps[name] = stamp
+
+    return stamp
+
+
+def forget_data_stamps(exception=None) -> None:
+    """
+    Drop the data stamps read by the request, registered as a teardown_request
+    hook: flask.g lives as long as the app context, which outlives the request when
+    the context was pushed beforehand (scripts, tests).
+
+    Args:
+        exception (Exception): The exception ending the request, if any.
+    """
+    g.pop("data_stamps", None)
+
+
+def get_data_version(name: str = "catalog") -> int:
+    """
+    Get the current version of a data set, see get_data_stamp.
+
+    Args:
+        name (str): The name of the data set. Defaults to "catalog".
+
+    Returns:
+        int: The current version, 0 if the data set was never versioned.
+    """
+    return get_data_stamp(name)[0]
+
+
+def bump_data_version(name: str = "catalog") -> int:
+    """
+    Atomically increment the version of a data set, invalidating everything cached
+    against the previous version.
+
+    Args:
+        name (str): The name of the data set. Defaults to "catalog".
+
+    Returns:
+        int: The new version.
+    """
+    updated = db.session.execute(
+        db.update(DataVersion)
+        .where(DataVersion.name == name)
+        .values(version=DataVersion.version + 1)
+    )
+    if not updated.rowcount:
+        db.session.add(DataVersion(name))
+    db.session.commit()
+
+    if has_request_context():
+        g.get("data_stamps", dict()).pop(name, None)
+
+    return get_data_version(name)
+
+
+def response_cache_key() -> tuple:
+    """
+    Build the response cache key of the current request: the endpoint, its URL
+    arguments and the sorted query string arguments.
+
+    Returns:
+        tuple: The hashable cache key.
+    """
+    return (
+        request.endpoint,
+        tuple(sorted(request.view_args.items())),
+        tuple(sorted(request.args.items(multi=True))),
+    )
+
+
+def cached_response(view):
+    """
+    Decorator caching the serialized JSON of a view's successful responses, keyed
+    by route and query string and stamped with the data version. The JSON is stored
+    with its compressed variants, so hits skip the queries, the serialization and
+    the compression and return the stored bytes in the client's encoding.
+
+    Args:
+        view (callable): A view returning a result dictionary.
+
+    Returns:
+        callable: The caching view.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        version = get_data_version()
+        key = response_cache_key()
+
+        variants = response_cache.get(key, version)
+        if variants is not None:
+            return variant_response(variants)
+
+        result = view(*args, **kwargs)
+        if result.get("status") != "success":
+            return result
+
+        variants = compress_variants(app.json.response(result).get_data())
+        response_cache.set(key, variants, version)
+
+        return variant_response(variants)
+
+    return wrapper
+
+
+def data_version_validators(**view_args):
+    """
+    Weak validators of a response derived from the whole catalog: an ETag naming
+    the catalog's data version and its last change as Last-Modified.
+
+    Args:
+        view_args: The view's URL arguments, unused.
+
+    Returns:
+        tuple: The ETag value and the last modification time, or None.
+    """
+    version, updated_at = get_data_stamp()
+
+    return f"catalog-{version}", updated_at
+
+
+def instance_validators(model, relations=(), include=None):
+    """
+    Build the strong validators of responses serializing an instance and some of
+    its relations. The ETag hashes the request's cache key with the (id,
+    updated_at) of the instance and, per relation, the number of links and the
+    latest updated_at of the links and related instances. Responses without
+    relations carry the instance's updated_at as Last-Modified, the others none, as
+    removing a link changes no updated_at. The validators are cached per request
+    and data version, so only the first request after a change queries them.
+
+    Args:
+        model (SQLAlchemy Model): The model of the instance.
+        relations (list): Names of the relations the response always serializes.
+        include (dict): Includable relations, when the response also serializes
+            the relations named by ?include=.
+
+    Returns:
+        callable: Computes the validators from the view's "id" argument, None when
+            the id is invalid, the instance does not exist, the include parameter is
+            invalid or the validators could not be queried.
+    """
+
+    def query_validators(id):
+        names = list(relations)
+        if include is not None:
+            includes = parse_include_parameter(request.args, include)
+            if includes is None:
+                return None
+            names.extend(includes)
+
+        instance = (
+            db.session.query(model.id, model.updated_at).filter(model.id == id).first()
+        )
+        if instance is None:
+            return None
+
+        stamps = [tuple(instance)]
+        for name in names:
+            relationship = inspect(model).relationships[name]
+            related = relationship.mapper.class_
+            association_table = relationship.secondary
+            owner_column = association_column(association_table, model)
+            related_column = association_column(association_table, related)
+
+            links = (
+                db.session.query(
+                    func.count(),
+                    func.max(association_table.c.updated_at),
+                    func.max(related.updated_at),
+                )
+                .select_from(association_table)
+                .join(related, related.id == related_column)
+                .filter(owner_column == instance.id)
+                .one()
+            )
+            stamps.append(tuple(links))
+
+        digest = hashlib.sha256(repr((response_cache_key(), stamps)).encode())
+        last_modified = None if names else instance.updated_at
+
+        return digest.hexdigest()[:32], last_modified
+
+    def validators(id, **view_args):
+        try:
+            int_id = int(id)
+        except ValueError:
+            # the view answers invalid ids itself
+            return None
+
+        version = get_data_version()
+        key = response_cache_key()
+
+        stamp = validator_cache.get(key, version)
+        if stamp is not None:
+            etag, last_modified = stamp
+            if last_modified is not None:
+                last_modified = datetime.fromisoformat(last_modified)
+            return etag, last_modified
+
+        try:
+            stamp = query_validators(int_id)
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            db.session.rollback()
+            return None
+        if stamp is not None:
+            etag, last_modified = stamp
+            if last_modified is not None:
+                last_modified = last_modified.isoformat()
+            validator_cache.set(key, [etag, last_modified], version)
+
+        return stamp
+
+    return validators
+
+
+def conditional_response(validators, weak: bool = False):
+    """
+    Decorator answering conditional GETs (If-None-Match, If-Modified-Since) with
+    304 Not Modified before the view runs, so revalidations skip the queries and
+    the serialization. Successful responses carry the ETag and Last-Modified, and
+    If-None-Match matches the ETag of the body in any content encoding, see
+    encoded_etag.
+
+    Args:
+        validators (callable): Computes the ETag value and last modification time
+            from the view's URL arguments, or None to leave the request alone.
+        weak (bool): Whether the ETag is weak.
+
+    Returns:
+        callable: The decorator.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            stamp = validators(**kwargs)
+            if stamp is None:
+                return view(*args, **kwargs)
+
+            etag, last_modified = stamp
+            if request.if_none_match:
+                # the client may hold the body in any encoding
+                encodings = ["identity", *ENCODINGS]
+                tags = [encoded_etag(etag, encoding) for encoding in encodings]
+                matched = [
+                    tag for tag in tags if request.if_none_match.contains_weak(tag)
+                ]
+                modified = not matched
+            else:
+                matched = []
+                modified = is_resource_modified(
+                    request.environ, last_modified=last_modified
+                )
+
+            if not modified:
+                # the encoding a 304 answered by date stands for is unknown, so it
+                # carries no ETag
+                response = app.response_class(status=304)
+                if matched:
+                    response.set_etag(matched[0], weak)
+            else:
+                result = view(*args, **kwargs)
+                # partial results must not be revalidated
+                if isinstance(result, dict) and (
+                    result.get("status") != "success"
+                    or "timed_out" in result
+                    or "failed" in result
+                ):
+                    return result
+                response = app.make_response(result)
+                response.set_etag(etag, weak)
+
+            if last_modified is not None:
+                response.last_modified = last_modified
+
+            return response
+
+        return wrapper
+
+    return decorator